@@ -1,29 +1,177 @@
+import argparse
+import threading
 import time
 import os
+from collections import OrderedDict
+from pathlib import Path
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
-WATCH_FOLDER = r"frame_designs/"
+from uploader import (
+    HttpUploader,
+    LocalDirectoryUploader,
+    UploadEngine,
+    UploadLedger,
+    UploadQueue,
+    serve_http_sink,
+)
 
-def upload_to_drive(path):
-    # TODO: Implement with Google Drive / Dropbox / etc. API
-    print(f"Uploading {path} to shared drive...")
-    # e.g. drive_service.files().create(...)
+# Where photobooth_editor_v2 saves strips (its GOOGLE_DRIVE_FOLDER)
+WATCH_FOLDER = Path(__file__).resolve().parent / "photos"
+QUEUE_DB = "upload_queue.sqlite3"
+UPLOAD_WORKERS = 3
+STATS_EVERY = 30   # seconds between throughput/backlog lines
+SETTLE_SECONDS = 2.0   # size/mtime must stay unchanged this long before upload
+PHOTO_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+SETTLED_MEMORY = 1024   # recently handed-on files remembered to drop duplicate events
+
+def make_uploader(args):
+    if args.backend == "http":
+        return HttpUploader(args.url)
+    return LocalDirectoryUploader(args.dest)
+
+class SettledFiles:
+    """Coalesces watcher events so each finished file is handed on once.
+
+    Files that arrive by rename (our atomic saves) are complete already.
+    Anything else is polled until its size and mtime stop changing for
+    `settle` seconds, so half-written files are never uploaded. Only the
+    last `memory` handed-on files are remembered: duplicate events follow
+    within seconds, and older repeats are caught by the upload ledger.
+    """
+
+    def __init__(self, on_ready, settle: float = SETTLE_SECONDS, memory: int = SETTLED_MEMORY):
+        self.on_ready = on_ready
+        self.settle = settle
+        self.memory = memory
+        self._lock = threading.Lock()
+        self._watching = {}          # path -> (size, mtime, first time seen unchanged)
+        self._done = OrderedDict()   # path -> (size, mtime) recently handed on
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="settle", daemon=True)
+        self._thread.start()
+
+    def _signature(self, path):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def _emit(self, path, sig):
+        with self._lock:
+            if sig is None or self._done.get(path) == sig:
+                return   # duplicate event for a file we already handed on
+            self._done[path] = sig
+            self._done.move_to_end(path)
+            while len(self._done) > self.memory:
+                self._done.popitem(last=False)
+            self._watching.pop(path, None)
+        self.on_ready(path)
+
+    def touched(self, path):
+        """A create/modify event: (re)start the settle timer for `path`."""
+        sig = self._signature(path)
+        with self._lock:
+            if sig is None or self._done.get(path) == sig:
+                return
+            self._watching[path] = sig + (time.monotonic(),)
+
+    def renamed(self, path):
+        """The file was moved into place atomically, so it is complete."""
+        self._emit(path, self._signature(path))
+
+    def _run(self):
+        while not self._stop.wait(0.25):
+            now = time.monotonic()
+            with self._lock:
+                watching = list(self._watching.items())
+
+            for path, (size, mtime, since) in watching:
+                sig = self._signature(path)
+                if sig is None:
+                    with self._lock:
+                        self._watching.pop(path, None)
+                elif sig != (size, mtime):
+                    with self._lock:
+                        self._watching[path] = sig + (now,)
+                elif size > 0 and now - since >= self.settle:
+                    self._emit(path, sig)
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(1.0)
 
 class PhotoHandler(FileSystemEventHandler):
+    """Only records jobs; uploads run on the engine's worker pool."""
+
+    def __init__(self, settled: SettledFiles):
+        super().__init__()
+        self.settled = settled
+
+    def _is_photo(self, path):
+        return path.lower().endswith(PHOTO_EXTENSIONS)
+
     def on_created(self, event):
-        if not event.is_directory:
-            if event.src_path.lower().endswith((".jpg", ".jpeg", ".png")):
-                upload_to_drive(event.src_path)
+        if not event.is_directory and self._is_photo(event.src_path):
+            self.settled.touched(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory and self._is_photo(event.src_path):
+            self.settled.touched(event.src_path)
+
+    def on_moved(self, event):
+        # Atomic saves write "<name>.part" and rename it to the final name
+        if not event.is_directory and self._is_photo(event.dest_path):
+            self.settled.renamed(event.dest_path)
 
 if __name__ == "__main__":
-    event_handler = PhotoHandler()
+    parser = argparse.ArgumentParser(description="Upload new photo strips as they appear")
+    parser.add_argument("--watch", type=Path, default=WATCH_FOLDER)
+    parser.add_argument("--backend", choices=["dir", "http"], default="dir")
+    parser.add_argument("--dest", default="uploaded", help="target folder for --backend dir")
+    parser.add_argument("--url", default="http://127.0.0.1:8765", help="target for --backend http")
+    parser.add_argument("--workers", type=int, default=UPLOAD_WORKERS)
+    parser.add_argument("--db", default=QUEUE_DB)
+    parser.add_argument("--serve-sink", metavar="DIR",
+                        help="run a local HTTP sink into DIR instead (for testing)")
+    args = parser.parse_args()
+
+    if args.serve_sink:
+        serve_http_sink(Path(args.serve_sink), int(args.url.rsplit(":", 1)[-1]))
+        raise SystemExit
+
+    queue = UploadQueue(Path(args.db))
+    ledger = UploadLedger(Path(args.db))
+    engine = UploadEngine(queue, make_uploader(args), workers=args.workers, ledger=ledger)
+    engine.start()
+    args.watch.mkdir(parents=True, exist_ok=True)   # before the app's first save
+
+    # Catch up on files written while we were not running; unchanged ones
+    # are answered from the ledger without being read
+    start = time.perf_counter()
+    queued = engine.scan(args.watch, PHOTO_EXTENSIONS)
+    print(f"Startup scan: {queued} to upload, {ledger.hashed} hashed "
+          f"in {time.perf_counter() - start:.2f}s")
+    print(f"Watching {os.path.abspath(args.watch)}; {engine.stats_text()}")
+
+    settled = SettledFiles(engine.submit)
+    event_handler = PhotoHandler(settled)
     observer = Observer()
-    observer.schedule(event_handler, WATCH_FOLDER, recursive=False)
+    observer.schedule(event_handler, str(args.watch), recursive=False)
     observer.start()
     try:
+        last_stats = time.monotonic()
         while True:
             time.sleep(1)
+            if time.monotonic() - last_stats >= STATS_EVERY:
+                print(engine.stats_text())
+                last_stats = time.monotonic()
     except KeyboardInterrupt:
         observer.stop()
     observer.join()
+    settled.stop()
+    engine.stop()
+    print(engine.stats_text())
+    ledger.close()
+    queue.close()
@@ -0,0 +1,51 @@
+import argparse
+import time
+from pathlib import Path
+
+from frame_assets import DesignBundle, FrameDesignCache
+from frame_layouts import LayoutIndex
+
+BASE_DIR = Path(__file__).resolve().parent
+BACKGROUND_DIR = BASE_DIR / "frame_designs"
+CACHE_DIR = BASE_DIR / "cache"
+BUNDLE_PATH = CACHE_DIR / "designs.bundle"
+LAYOUT_INDEX_PATH = CACHE_DIR / "frame_layouts.json"
+
+# Must match the editor's canvas, or the app ignores the bundle
+WIDTH = 1000
+HEIGHT = 1000
+
+
+def load_designs(bundle=None):
+    cache = FrameDesignCache(
+        BACKGROUND_DIR, WIDTH, HEIGHT,
+        layout_index=LayoutIndex(LAYOUT_INDEX_PATH), bundle=bundle,
+    )
+    start = time.perf_counter()
+    designs = cache.load_all()
+    return designs, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Pre-bake frame designs into a memory-mapped bundle for fast startup"
+    )
+    parser.add_argument("--out", type=Path, default=BUNDLE_PATH)
+    parser.add_argument("--repeat", type=int, default=3, help="timed loads of each kind")
+    args = parser.parse_args()
+
+    # Decode path (what startup costs without a bundle), then bake from it
+    decode_times = []
+    for _ in range(args.repeat):
+        designs, elapsed = load_designs()
+        decode_times.append(elapsed)
+    DesignBundle(args.out).save(designs, WIDTH, HEIGHT)
+    print(f"Baked {len(designs)} designs into {args.out} ({args.out.stat().st_size / 1e6:.1f} MB)")
+
+    bundle_times = []
+    for _ in range(args.repeat):
+        _, elapsed = load_designs(DesignBundle(args.out))
+        bundle_times.append(elapsed)
+
+    print(f"decode from PNG: {min(decode_times) * 1000:8.1f} ms")
+    print(f"load from bundle: {min(bundle_times) * 1000:7.1f} ms")
@@ -0,0 +1,486 @@
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from camera import FrameGrabber
+from compositor import StripSpec, composite_strip, render_batch, render_print, render_sheet
+from encoders import ENCODER_PRESETS, get_encoder
+from frame_assets import DesignBundle, FrameDesign, FrameDesignCache, resize_to_fit
+from filters import FILTERS
+from frame_sources import open_source
+from image_pipeline import PREVIEW_MODES, ThumbnailCache, crop_array_to_ratio, scale_for_preview
+from memory_stats import current_rss_bytes
+from perf import PerfStats
+
+BASE_DIR = Path(__file__).resolve().parent
+BACKGROUND_DIR = BASE_DIR / "frame_designs"
+LAYOUT_INDEX_PATH = BASE_DIR / "cache" / "frame_layouts.json"
+
+WIDTH = 1000
+HEIGHT = 1000
+SLOT_W = 354
+SLOT_H = 236
+SLOT_RATIO = SLOT_W / SLOT_H
+PREVIEW_SIZE = (1300, int(1300 / SLOT_RATIO))
+SELECTOR_THUMB = (110 - 6, int(110 / SLOT_RATIO) - 6)
+
+FRAME_SIZES = {"720p": (1280, 720), "1080p": (1920, 1080), "4k": (3840, 2160)}
+BASELINE_DIR = BASE_DIR / "bench_baselines"
+
+
+# -------------------------------------------------------------------
+# SYNTHETIC INPUTS
+# -------------------------------------------------------------------
+def synthetic_photo(w: int, h: int, seed: int = 0) -> Image.Image:
+    """Smooth gradients plus sensor-like noise, so encoders see photo content."""
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:h, 0:w].astype(np.float32)
+    base = np.stack([
+        128 + 100 * np.sin(xx / (w / 3) + seed),
+        128 + 100 * np.cos(yy / (h / 2) + seed),
+        128 + 60 * np.sin((xx + yy) / (w / 5)),
+    ], axis=-1)
+    noisy = base + rng.normal(0, 8, base.shape)
+    return Image.fromarray(np.clip(noisy, 0, 255).astype(np.uint8))
+
+
+def strip_for_design(design: FrameDesign, photos: List[Image.Image]) -> Image.Image:
+    """Composite like the app does on save (detected windows on the 1000px canvas)."""
+    bg_w, bg_h = design.size
+    x0, y0 = (WIDTH - bg_w) // 2, (HEIGHT - bg_h) // 2
+    positions = [(x0 + x, y0 + y, w, h) for x, y, w, h in design.slot_rects()]
+    return composite_strip(photos, design, positions, (WIDTH, HEIGHT), SLOT_H)
+
+
+def load_designs() -> List[FrameDesign]:
+    from frame_layouts import LayoutIndex
+
+    index = LayoutIndex(LAYOUT_INDEX_PATH)
+    return FrameDesignCache(BACKGROUND_DIR, WIDTH, HEIGHT, layout_index=index).load_all()
+
+
+def real_composites() -> List[Image.Image]:
+    photos = [synthetic_photo(SLOT_W * 2, SLOT_H * 2, seed=i) for i in range(4)]
+    return [strip_for_design(d, photos) for d in load_designs()]
+
+
+def synthetic_frame(size: Tuple[int, int], seed: int = 0) -> np.ndarray:
+    """A BGR camera frame of `size` (w, h), as cv2.VideoCapture.read() returns."""
+    return np.asarray(synthetic_photo(size[0], size[1], seed))[:, :, ::-1].copy()
+
+
+# -------------------------------------------------------------------
+# BATCH CHECK
+# -------------------------------------------------------------------
+def check_batch() -> bool:
+    """render_batch must give the same pixels as the in-app composite."""
+    designs = load_designs()
+    photos = [synthetic_photo(SLOT_W * 2, SLOT_H * 2, seed=i) for i in range(4)]
+    specs = []
+    for d in designs:
+        bg_w, bg_h = d.size
+        x0, y0 = (WIDTH - bg_w) // 2, (HEIGHT - bg_h) // 2
+        positions = [(x0 + x, y0 + y, w, h) for x, y, w, h in d.slot_rects()]
+        specs.append(StripSpec(photos, d.path, positions))
+
+    batch = render_batch(specs, BACKGROUND_DIR, (WIDTH, HEIGHT), SLOT_H,
+                         layout_index_path=LAYOUT_INDEX_PATH)
+    ok = True
+    for d, spec, got in zip(designs, specs, batch):
+        expected = composite_strip(photos, d, spec.positions, (WIDTH, HEIGHT), SLOT_H)
+        diff = np.abs(np.asarray(got, np.int16) - np.asarray(expected, np.int16)).max()
+        status = "ok" if diff == 0 else f"MISMATCH (max diff {diff})"
+        print(f"{d.path.name:<12}{d.slot_kind:<8}{status}")
+        ok = ok and diff == 0
+    return ok
+
+
+# -------------------------------------------------------------------
+# ENCODER BENCHMARK
+# -------------------------------------------------------------------
+def bench_encoders(presets: List[str], repeat: int):
+    strips = real_composites()
+    print(f"{len(strips)} composites from {BACKGROUND_DIR}, {repeat} run(s) each\n")
+    print(f"{'encoder':<15}{'encode ms':>12}{'size KB':>12}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in presets:
+            encoder = get_encoder(name)
+            times, sizes = [], []
+            for i, strip in enumerate(strips):
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    path = encoder.save(strip, Path(tmp) / f"strip_{i}")
+                    times.append(time.perf_counter() - start)
+                sizes.append(path.stat().st_size)
+
+            print(
+                f"{name:<15}{statistics.median(times) * 1000:>12.1f}"
+                f"{statistics.mean(sizes) / 1024:>12.1f}"
+            )
+
+
+# -------------------------------------------------------------------
+# PIPELINE BENCHMARK
+# -------------------------------------------------------------------
+# Each case's setup runs untimed and returns (operation, items per call).
+# Throughput is items per second, so "design_decode" counts designs, etc.
+Case = Callable[[], Tuple[Callable[[], object], int]]
+
+
+def _case_design_decode():
+    def run():
+        return load_designs()
+    return run, len(FrameDesignCache(BACKGROUND_DIR, WIDTH, HEIGHT).design_paths())
+
+
+def _case_design_bundle():
+    # Deleted once `run` (which holds it) is dropped
+    tmp = tempfile.TemporaryDirectory()
+    bundle = Path(tmp.name) / "designs.bundle"
+    DesignBundle(bundle).save(load_designs(), WIDTH, HEIGHT)
+    cache = FrameDesignCache(BACKGROUND_DIR, WIDTH, HEIGHT)
+    paths = cache.design_paths()
+
+    def run():
+        return DesignBundle(Path(tmp.name) / "designs.bundle").load(paths, WIDTH, HEIGHT)
+    return run, len(paths)
+
+
+def _case_resize_to_fit():
+    sources = []
+    for path in FrameDesignCache(BACKGROUND_DIR, WIDTH, HEIGHT).design_paths():
+        with Image.open(path) as img:
+            sources.append(img.convert("RGBA"))
+
+    def run():
+        return [resize_to_fit(img, WIDTH, HEIGHT) for img in sources]
+    return run, len(sources)
+
+
+def _case_camera_convert(size: str):
+    frame = synthetic_frame(FRAME_SIZES[size])
+
+    def run():
+        return cv2.flip(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB), 1)
+    return run, 1
+
+
+def _case_crop_to_slot(size: str):
+    frame = synthetic_frame(FRAME_SIZES[size])
+
+    def run():
+        # What a still costs: the crop view plus one contiguous copy
+        return np.ascontiguousarray(crop_array_to_ratio(frame, SLOT_RATIO))
+    return run, 1
+
+
+def _case_preview(mode: str):
+    frame = synthetic_frame(FRAME_SIZES["1080p"])
+
+    def run():
+        return scale_for_preview(crop_array_to_ratio(frame, SLOT_RATIO), PREVIEW_SIZE, mode)
+    return run, 1
+
+
+def _case_live_filter(name: str):
+    preview = scale_for_preview(crop_array_to_ratio(synthetic_frame(FRAME_SIZES["1080p"]),
+                                                    SLOT_RATIO), PREVIEW_SIZE)
+    look = FILTERS[name]
+
+    def run():
+        return look.apply_array(preview)
+    return run, 1
+
+
+def _case_still_downscale(size: str):
+    original = Image.fromarray(crop_array_to_ratio(synthetic_frame(FRAME_SIZES[size]), SLOT_RATIO))
+
+    def run():
+        return original.resize((SLOT_W, SLOT_H), Image.LANCZOS)
+    return run, 1
+
+
+def _case_selector_thumbs():
+    thumbs = ThumbnailCache(SELECTOR_THUMB)
+    photos = [synthetic_photo(SLOT_W, SLOT_H, seed=i) for i in range(8)]
+
+    def run():
+        # Same path as the app: queue every capture, then collect
+        for i, img in enumerate(photos):
+            thumbs.submit(i, 0, img)
+        return [thumbs.get(i, 0) for i in range(len(photos))]
+    return run, len(photos)
+
+
+def _still_photos() -> List[Image.Image]:
+    w, h = FRAME_SIZES["1080p"]
+    return [synthetic_photo(int(h * SLOT_RATIO), h, seed=i) for i in range(4)]
+
+
+def _case_composite_strip():
+    designs = load_designs()
+    photos = _still_photos()
+
+    def run():
+        return [strip_for_design(d, photos) for d in designs]
+    return run, len(designs)
+
+
+def _case_render_print():
+    design = load_designs()[0]
+    photos = _still_photos()
+
+    def run():
+        return render_print(photos, design, design.slots, (6, 4), 300)
+    return run, 1
+
+
+def _case_render_sheet():
+    # Four print strips on one 2x2 sheet, streamed to a PNG band by band
+    designs = load_designs()
+    photos = _still_photos()
+    strips = [(photos, designs[i % len(designs)], designs[i % len(designs)].slots)
+              for i in range(4)]
+    tmp = tempfile.TemporaryDirectory()   # deleted once `run` is dropped
+
+    def run():
+        return render_sheet(strips, 2, Path(tmp.name) / "sheet.png")
+    return run, len(strips)
+
+
+PIPELINE_CASES: Dict[str, Callable[[], Case]] = {
+    "design_decode": _case_design_decode,
+    "design_bundle": _case_design_bundle,
+    "resize_to_fit": _case_resize_to_fit,
+    **{f"camera_convert_{s}": (lambda s=s: _case_camera_convert(s)) for s in FRAME_SIZES},
+    **{f"crop_to_slot_{s}": (lambda s=s: _case_crop_to_slot(s)) for s in FRAME_SIZES},
+    **{f"preview_{m}": (lambda m=m: _case_preview(m)) for m in PREVIEW_MODES},
+    **{f"live_filter_{n}": (lambda n=n: _case_live_filter(n)) for n in FILTERS if n != "none"},
+    "still_downscale_1080p": lambda: _case_still_downscale("1080p"),
+    "still_downscale_4k": lambda: _case_still_downscale("4k"),
+    "selector_thumbs": _case_selector_thumbs,
+    "composite_strip": _case_composite_strip,
+    "render_print": _case_render_print,
+    "render_sheet": _case_render_sheet,
+}
+
+
+class _RSSSampler:
+    """Polls the process RSS on a thread and keeps the highest value seen (bytes)."""
+
+    def __init__(self, interval: float = 0.0005):
+        self.interval = interval
+        self.peak = current_rss_bytes()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, current_rss_bytes())
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        if self.peak is not None:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self.peak is not None:
+            self._thread.join()
+
+
+def _time_case(name: str, min_time: float) -> dict:
+    """Time one case (in a fresh process, with the normal allocator)."""
+    run, items = PIPELINE_CASES[name]()
+    run()   # warm-up (lazy imports, allocator)
+
+    times = []
+    start = time.perf_counter()
+    while time.perf_counter() - start < min_time or len(times) < 3:
+        t0 = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - t0)
+    return {
+        "items_per_s": items * len(times) / sum(times),
+        "median_ms": statistics.median(times) * 1000,
+        "runs": len(times),
+    }
+
+
+def _memory_case(name: str) -> Optional[float]:
+    """Peak RSS growth of two calls over the case's setup, in MB."""
+    run, _ = PIPELINE_CASES[name]()
+    gc.collect()
+    rss_before = current_rss_bytes()
+    if rss_before is None:
+        return None
+    with _RSSSampler() as sampler:
+        run()
+        run()
+    return max(0.0, (sampler.peak - rss_before) / 1e6)
+
+
+def _in_fresh_process(fn, *args, env: Optional[Dict[str, str]] = None):
+    saved = {k: os.environ.get(k) for k in env or {}}
+    os.environ.update(env or {})
+    try:
+        spawn = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+            return pool.submit(fn, *args).result()
+    finally:
+        for k, v in saved.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+
+# glibc: keep large buffers mmap-backed for the memory pass, so freed setup
+# memory is not silently reused and every image buffer shows up in RSS.
+# (Only for that pass: it would slow down the timed one.)
+MEMORY_PASS_ENV = {"MALLOC_MMAP_THRESHOLD_": str(128 * 1024)}
+
+
+def bench_pipeline(names: List[str], min_time: float) -> Dict[str, dict]:
+    print(f"{'operation':<26}{'items/s':>11}{'median ms':>12}{'peak +MB':>10}{'runs':>7}")
+    results = {}
+    for name in names:
+        r = _in_fresh_process(_time_case, name, min_time)
+        r["peak_mb"] = _in_fresh_process(_memory_case, name, env=MEMORY_PASS_ENV)
+        results[name] = r
+        peak = "n/a" if r["peak_mb"] is None else f"{r['peak_mb']:.1f}"
+        print(f"{name:<26}{r['items_per_s']:>11.1f}{r['median_ms']:>12.2f}{peak:>10}{r['runs']:>7}")
+    return results
+
+
+def save_baseline(path: Path, results: Dict[str, dict]):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    baseline = {
+        "host": platform.node(),
+        "machine": platform.machine(),
+        "python": platform.python_version(),
+        "saved": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    path.write_text(json.dumps(baseline, indent=2))
+    print(f"\nBaseline saved to {path}")
+
+
+def compare_baseline(path: Path, results: Dict[str, dict], tolerance: float) -> int:
+    """Print changes against a saved baseline; returns the number of regressions."""
+    baseline = json.loads(path.read_text())["results"]
+    print(f"\nAgainst {path} (tolerance {tolerance:.0%}):")
+    regressions = 0
+    for name, r in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        speed = r["items_per_s"] / old["items_per_s"] - 1
+        notes = []
+        if speed < -tolerance:
+            notes.append("SLOWER")
+        if r["peak_mb"] is not None and old.get("peak_mb") is not None:
+            # Small absolute slack: peak RSS moves by a few MB run to run
+            if r["peak_mb"] > old["peak_mb"] * (1 + tolerance) + 5:
+                notes.append("MORE MEMORY")
+        regressions += bool(notes)
+        print(f"  {name:<26}{speed:>+8.1%}  {' '.join(notes)}")
+    return regressions
+
+
+# -------------------------------------------------------------------
+# CAPTURE SOAK (no camera needed with a synthetic/file source)
+# -------------------------------------------------------------------
+def bench_capture(source: str, seconds: float, display_fps: float, mode: str):
+    """Run the capture thread plus a UI-like consumer, like the live preview."""
+    perf = PerfStats(window=1000)
+    cap = open_source(source)
+    if not cap.isOpened():
+        raise SystemExit(f"Could not open {source}")
+    grabber = FrameGrabber(cap, perf=perf)
+    grabber.start()
+
+    shown, last_seq = 0, 0
+    end = time.monotonic() + seconds
+    while time.monotonic() < end and not grabber.failed:
+        frame = grabber.latest()
+        if frame is not None and frame.seq != last_seq:
+            last_seq = frame.seq
+            with perf.measure("preview"):
+                scale_for_preview(crop_array_to_ratio(frame.image, SLOT_RATIO), PREVIEW_SIZE, mode)
+            perf.record("latency", time.monotonic() - frame.timestamp)
+            shown += 1
+        time.sleep(1 / display_fps)
+
+    grabber.stop()
+    cap.release()
+    print(f"{source}: {grabber.latest_seq} frames read, {shown} shown in {seconds:.0f}s")
+    print(f"capture {grabber.latest_seq / seconds:.1f} fps · display {shown / seconds:.1f} fps"
+          f" · dropped {grabber.dropped_frames}\n")
+    print(f"{'stage':<12}{'mean ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for stage, st in perf.snapshot()["stages"].items():
+        print(f"{stage:<12}{st['mean_ms']:>10.2f}{st['p95_ms']:>10.2f}{st['max_ms']:>10.2f}")
+
+
+# -------------------------------------------------------------------
+# MAIN
+# -------------------------------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Photobooth image pipeline benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    enc = sub.add_parser("encoders", help="encode time and file size per output encoder")
+    enc.add_argument("--presets", nargs="+", default=list(ENCODER_PRESETS),
+                     choices=list(ENCODER_PRESETS))
+    enc.add_argument("--repeat", type=int, default=3)
+
+    pipe = sub.add_parser("pipeline", help="throughput and peak memory of the hot paths")
+    pipe.add_argument("--only", nargs="+", default=list(PIPELINE_CASES),
+                      choices=list(PIPELINE_CASES), metavar="CASE")
+    pipe.add_argument("--min-time", type=float, default=1.0, help="seconds per case")
+    pipe.add_argument("--baseline", type=Path,
+                      default=BASELINE_DIR / f"{platform.node() or 'local'}.json")
+    pipe.add_argument("--save-baseline", action="store_true",
+                      help="store these results as the baseline")
+    pipe.add_argument("--tolerance", type=float, default=0.15,
+                      help="slowdown (fraction) reported as a regression")
+
+    sub.add_parser("check-batch", help="batch renders match the in-app composite")
+
+    soak = sub.add_parser("capture", help="capture thread + preview consumer on a frame source")
+    soak.add_argument("--source", default="synthetic:1920x1080@30",
+                      help="frame_sources spec, e.g. synthetic:3840x2160@0 or video:clip.mp4")
+    soak.add_argument("--seconds", type=float, default=10)
+    soak.add_argument("--display-fps", type=float, default=33, help="UI poll rate (app: ~30 ms)")
+    soak.add_argument("--mode", default="balanced", choices=list(PREVIEW_MODES))
+
+    args = parser.parse_args()
+    if args.command == "check-batch":
+        raise SystemExit(0 if check_batch() else 1)
+    elif args.command == "capture":
+        bench_capture(args.source, args.seconds, args.display_fps, args.mode)
+    elif args.command == "encoders":
+        bench_encoders(args.presets, args.repeat)
+    elif args.command == "pipeline":
+        results = bench_pipeline(args.only, args.min_time)
+        if args.save_baseline:
+            save_baseline(args.baseline, results)
+        elif args.baseline.exists():
+            # Non-zero exit on regressions, so this can gate a build
+            raise SystemExit(1 if compare_baseline(args.baseline, results, args.tolerance) else 0)
@@ -0,0 +1,372 @@
+import threading
+import time
+from collections import deque
+from typing import List, NamedTuple, Optional, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from frame_sources import FrameSource, open_source
+from image_pipeline import crop_array_to_ratio
+from perf import PerfStats
+
+
+# -------------------------------------------------------------------
+# FRAME SLOT
+# -------------------------------------------------------------------
+class Frame(NamedTuple):
+    """One camera frame (RGB, already mirrored) plus when it was read."""
+    image: np.ndarray
+    timestamp: float   # time.monotonic() when read() returned
+    seq: int           # increases by 1 for every frame read from the camera
+
+
+# -------------------------------------------------------------------
+# CAPTURE THREAD
+# -------------------------------------------------------------------
+class FrameGrabber:
+    """Reads frames from a FrameSource (or cv2.VideoCapture) on its own thread.
+
+    Only the newest frame is kept (plus the last `history` frames, for burst
+    capture). The UI calls latest() whenever it wants to draw, so a slow
+    read() never blocks the Tk mainloop.
+    """
+
+    def __init__(self, cap: FrameSource, fps_window: int = 30,
+                 perf: Optional[PerfStats] = None, history: int = 0):
+        self.cap = cap
+        self.perf = perf or PerfStats(enabled=False)
+        self._lock = threading.Condition()
+        self._frame: Optional[Frame] = None
+        self._history = deque(maxlen=history)
+        self._consumed = True
+        self._seq = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._read_times = deque(maxlen=fps_window)
+
+        self.dropped_frames = 0   # frames overwritten before the UI saw them
+        self.failed = False       # set when read() stops returning frames
+
+    # ---------------------- lifecycle ---------------------------------
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="FrameGrabber", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and not self.failed
+
+    def _run(self):
+        perf = self.perf
+        while not self._stop.is_set():
+            t0 = time.perf_counter()
+            ret, raw = self.cap.read()
+            if not ret:
+                with self._lock:
+                    self.failed = True
+                    self._lock.notify_all()
+                return
+
+            t1 = time.perf_counter()
+            rgb = cv2.cvtColor(raw, cv2.COLOR_BGR2RGB)
+            t2 = time.perf_counter()
+            rgb = cv2.flip(rgb, 1)
+            perf.record("read", t1 - t0)
+            perf.record("cvtColor", t2 - t1)
+            perf.record("flip", time.perf_counter() - t2)
+            now = time.monotonic()
+
+            with self._lock:
+                if not self._consumed:
+                    self.dropped_frames += 1
+                self._seq += 1
+                self._frame = Frame(rgb, now, self._seq)
+                if self._history.maxlen:
+                    self._history.append(self._frame)
+                self._consumed = False
+                self._read_times.append(now)
+                self._lock.notify_all()
+
+    # ---------------------- reading -----------------------------------
+    def latest(self) -> Optional[Frame]:
+        """Return the newest frame (or None yet). Never blocks on the camera."""
+        with self._lock:
+            self._consumed = True
+            return self._frame
+
+    @property
+    def latest_seq(self) -> int:
+        """Sequence number of the newest frame read so far (0 before any)."""
+        with self._lock:
+            return self._seq
+
+    def wait_for_frame(self, after_seq: int, timeout: float = 1.0) -> Optional[Frame]:
+        """Block until a frame newer than `after_seq` arrives (off the UI thread!).
+
+        Returns the newest frame, which may be older than asked for on timeout
+        or camera failure. Does not count as the UI consuming the frame.
+        """
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            while not self.failed and (self._frame is None or self._frame.seq <= after_seq):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._lock.wait(remaining)
+            return self._frame
+
+    def seq_at(self, when: float) -> int:
+        """Seq of the newest frame read at or before monotonic time `when`.
+
+        Uses the history when there is one, so a capture scheduled for
+        `when` gets the frame from that moment even if the caller runs late.
+        """
+        with self._lock:
+            for frame in reversed(self._history):
+                if frame.timestamp <= when:
+                    return frame.seq
+            return self._seq
+
+    def recent_frames(self) -> List[Frame]:
+        """The last `history` frames, oldest first."""
+        with self._lock:
+            return list(self._history)
+
+    def capture_fps(self) -> float:
+        """Real capture rate over the last `fps_window` frames."""
+        with self._lock:
+            times = list(self._read_times)
+        if len(times) < 2 or times[-1] == times[0]:
+            return 0.0
+        return (len(times) - 1) / (times[-1] - times[0])
+
+    def stats_text(self) -> str:
+        return f"Camera {self.capture_fps():.1f} fps · dropped {self.dropped_frames}"
+
+
+# -------------------------------------------------------------------
+# CAMERA SETUP / STILLS
+# -------------------------------------------------------------------
+class CameraWarmer:
+    """Opens and warms up the camera on a background thread.
+
+    warm() is cheap to call often (landing page shown, mouse moved): it
+    starts opening the device if needed and pushes back the idle deadline.
+    Once `warmup_frames` frames have been read (auto exposure and white
+    balance settle during those), acquire() hands over the running grabber.
+    While nobody holds it, the device is released after `idle_timeout` s.
+    After a failed open, warm() waits `retry_delay` s before trying again
+    unless called with retry=True.
+    """
+
+    def __init__(self, source: str = "device:0", request_size: Optional[Tuple[int, int]] = None,
+                 warmup_frames: int = 15, idle_timeout: float = 120.0,
+                 warmup_timeout: float = 5.0, perf: Optional[PerfStats] = None,
+                 history: int = 0, retry_delay: float = 10.0):
+        self.source = source   # see frame_sources.open_source
+        self.perf = perf
+        self.history = history   # frames the grabber keeps for burst capture
+        self.request_size = request_size
+        self.warmup_frames = warmup_frames
+        self.idle_timeout = idle_timeout
+        self.warmup_timeout = warmup_timeout
+        self.retry_delay = retry_delay
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._grabber: Optional[FrameGrabber] = None
+        self._in_use = False
+        self._idle_deadline = 0.0
+        self._failed_at = 0.0
+
+        self.error: Optional[str] = None   # set when opening the camera failed
+        self.open_seconds = 0.0            # how long the last open + warm-up took
+
+    def warm(self, retry: bool = False):
+        """Start opening the camera (if closed) and reset the idle timer.
+
+        Pass retry=True when someone explicitly asked for the camera, to skip
+        the wait after a failed open.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._idle_deadline = now + self.idle_timeout
+            if self._thread is not None:
+                return
+            if self.error and not retry and now - self._failed_at < self.retry_delay:
+                return   # don't start a new open on every mouse move
+            self.error = None
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="CameraWarmer", daemon=True)
+            self._thread.start()
+
+    def acquire(self) -> Optional[FrameGrabber]:
+        """The warmed-up grabber, or None while the camera is still opening."""
+        with self._lock:
+            if self._grabber is None:
+                return None
+            self._in_use = True
+            return self._grabber
+
+    def release(self):
+        """The session is done with the camera; keep it warm until idle_timeout."""
+        with self._lock:
+            self._in_use = False
+            self._idle_deadline = time.monotonic() + self.idle_timeout
+
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            return self._grabber is not None
+
+    def close(self, timeout: float = 2.0):
+        """Release the device now (app exit)."""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self):
+        start = time.monotonic()
+        try:
+            cap = open_source(self.source, self.request_size)
+        except (OSError, ValueError) as e:
+            with self._lock:
+                self.error = f"Could not open frame source {self.source!r}: {e}"
+                self._failed_at = time.monotonic()
+                self._thread = None
+            return
+        grabber = FrameGrabber(cap, perf=self.perf, history=self.history)
+        if cap.isOpened():
+            grabber.start()
+            # Throw away the first frames while exposure settles
+            grabber.wait_for_frame(self.warmup_frames, self.warmup_timeout)
+
+        with self._lock:
+            if not cap.isOpened() or grabber.failed:
+                self.error = "Could not open camera. Check permissions."
+                self._failed_at = time.monotonic()
+                self._thread = None
+                grabber.stop()
+                cap.release()
+                return
+            self._grabber = grabber
+            self.open_seconds = time.monotonic() - start
+
+        while not self._stop.wait(0.5):
+            with self._lock:
+                idle = not self._in_use and time.monotonic() >= self._idle_deadline
+                if idle or grabber.failed:
+                    break
+        with self._lock:
+            self._grabber = None   # no new acquire() while we shut down
+
+        grabber.stop()
+        cap.release()
+        with self._lock:
+            self._in_use = False
+            self._thread = None
+
+
+def grab_still(grabber: FrameGrabber, after_seq: int, ratio: float,
+               slot_size: Tuple[int, int], timeout: float = 1.0
+               ) -> Tuple[Image.Image, Image.Image]:
+    """Take the first frame read after the shutter moment (`after_seq`).
+
+    Returns (original, working): the crop to `ratio` at the stream's
+    resolution, and a LANCZOS copy at `slot_size` for the layout screens.
+    Meant to run on a worker thread.
+    """
+    frame = grabber.wait_for_frame(after_seq, timeout)
+    if frame is None:
+        raise RuntimeError("No camera frame available to capture.")
+
+    # One contiguous copy of just the cropped pixels
+    original = Image.fromarray(np.ascontiguousarray(crop_array_to_ratio(frame.image, ratio)))
+    working = original.resize(slot_size, Image.LANCZOS)
+    return original, working
+
+
+# -------------------------------------------------------------------
+# BURST CAPTURE
+# -------------------------------------------------------------------
+def sharpness_scores(gray: np.ndarray) -> np.ndarray:
+    """Variance of the 4-neighbour Laplacian for every image in an (N, H, W) stack."""
+    center = gray[:, 1:-1, 1:-1]
+    laplacian = (gray[:, :-2, 1:-1] + gray[:, 2:, 1:-1] +
+                 gray[:, 1:-1, :-2] + gray[:, 1:-1, 2:] - 4 * center)
+    return laplacian.reshape(len(gray), -1).var(axis=1)
+
+
+class BurstCapture:
+    """Keeps the sharpest of `frames` frames around the shutter moment.
+
+    Takes `before` frames from the grabber's history and waits for the rest.
+    Each candidate is scored on a small grayscale copy; the copies live in
+    one buffer that is allocated once and reused for every shot, and only
+    the winner gets the full-resolution copy and LANCZOS pass. Meant to run
+    on a single worker thread.
+    """
+
+    def __init__(self, frames: int = 5, before: int = 2, score_width: int = 320,
+                 perf: Optional[PerfStats] = None):
+        self.frames = frames
+        self.before = min(before, frames - 1)
+        self.score_width = score_width
+        self.perf = perf or PerfStats(enabled=False)
+        self._gray: Optional[np.ndarray] = None   # (frames, h, w) float32 score buffer
+        self.last_scores: List[float] = []
+        self.last_choice = -1                     # index into last_scores
+
+    def _score_buffer(self, crop_shape) -> Tuple[np.ndarray, int]:
+        """The reusable (frames, h, w) buffer and the integer downscale factor."""
+        h, w = crop_shape[:2]
+        factor = max(1, w // self.score_width)
+        size = (self.frames, max(3, h // factor), max(3, w // factor))
+        if self._gray is None or self._gray.shape != size:
+            self._gray = np.empty(size, np.float32)
+        return self._gray, factor
+
+    def capture(self, grabber: FrameGrabber, shutter_seq: int, ratio: float,
+                slot_size: Tuple[int, int], timeout: float = 1.0
+                ) -> Tuple[Image.Image, Image.Image]:
+        """Same result as grab_still(), from the sharpest frame of the burst."""
+        after = self.frames - self.before
+        grabber.wait_for_frame(shutter_seq + after - 1, timeout)
+        first, last = shutter_seq - self.before, shutter_seq + after
+        frames = [f for f in grabber.recent_frames() if first < f.seq <= last]
+        if not frames:
+            # No history (or a stalled camera): fall back to a single frame
+            return grab_still(grabber, shutter_seq, ratio, slot_size, timeout)
+
+        start = time.perf_counter()
+        crops = [crop_array_to_ratio(f.image, ratio) for f in frames]
+        gray, factor = self._score_buffer(crops[0].shape)
+        gray = gray[:len(crops)]
+        h, w = gray.shape[1] * factor, gray.shape[2] * factor
+        for i, crop in enumerate(crops):
+            # Whole-factor INTER_AREA takes OpenCV's fast box-filter path
+            small = cv2.cvtColor(crop[:h, :w], cv2.COLOR_RGB2GRAY)
+            gray[i] = cv2.resize(small, (gray.shape[2], gray.shape[1]),
+                                 interpolation=cv2.INTER_AREA)
+        scores = sharpness_scores(gray)
+        best = int(np.argmax(scores))
+        self.perf.record("burst_score", time.perf_counter() - start)
+
+        self.last_scores = scores.tolist()
+        self.last_choice = best
+        original = Image.fromarray(np.ascontiguousarray(crops[best]))
+        working = original.resize(slot_size, Image.LANCZOS)
+        return original, working
@@ -0,0 +1,421 @@
+import os
+import struct
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from PIL import Image, ImageOps
+
+from encoders import PARTIAL_SUFFIX, atomic_write
+from frame_assets import FrameDesign, FrameDesignCache
+from frame_layouts import LayoutIndex
+
+PHOTO_BORDER = 2   # white border around each photo, in output pixels
+
+
+# -------------------------------------------------------------------
+# SINGLE STRIP (the hot path shared by the app, batch mode and benchmarks)
+# -------------------------------------------------------------------
+def composite_strip(
+    photos: Sequence[Optional[Image.Image]],
+    design: Optional[FrameDesign],
+    positions: Sequence[Tuple[int, int]],
+    canvas_size: Tuple[int, int],
+    slot_h: int,
+    border: int = PHOTO_BORDER,
+) -> Image.Image:
+    """Paste photos behind the frame design and crop to the design bounds."""
+    width, height = canvas_size
+    canvas_image = Image.new("RGBA", (width, height), (255, 255, 255, 255))
+
+    crop_region = (0, 0, width, height)
+    x_offset = y_offset = 0
+
+    if design is not None:
+        bg_width, bg_height = design.size
+        x_offset = (width - bg_width) // 2
+        y_offset = (height - bg_height) // 2
+
+        # Crop to the frame bounds
+        crop_region = (
+            x_offset,
+            y_offset,
+            x_offset + bg_width,
+            y_offset + bg_height,
+        )
+
+    photos_on_top = design is not None and design.photos_on_top
+
+    # --- 1) Paste FRAME first if its windows are opaque ---
+    if photos_on_top:
+        canvas_image.paste(design.rgba, (x_offset, y_offset), design.alpha)
+
+    # --- 2) Paste PHOTOS ---
+    for idx, img in enumerate(photos):
+        if img is None:
+            continue
+        if idx >= len(positions):
+            break
+
+        photo, xy = _fit_photo(img, positions[idx], slot_h, border, photos_on_top)
+        canvas_image.paste(photo, xy)
+
+    # --- 3) Paste FRAME / BACKGROUND on TOP using alpha mask ---
+    if design is not None and not photos_on_top:
+        # Photos stay visible through the transparent holes
+        canvas_image.paste(design.rgba, (x_offset, y_offset), design.alpha)
+
+    return canvas_image.crop(crop_region)
+
+
+def _fit_photo(img: Image.Image, position: Sequence[int], slot_h: int,
+               border: int, exact: bool) -> Tuple[Image.Image, Tuple[int, int]]:
+    """Scale a photo for one slot; returns (photo, paste position).
+
+    `position` is (x, y) for the fixed layout (scale to slot_h, add a white
+    border) or (x, y, w, h) for a detected window (cover-crop to w x h; a
+    hole gets `border` px of overlap so no gap shows under the frame edge).
+    """
+    img = img.convert("RGB")
+    x, y = position[0], position[1]
+    if len(position) == 4:
+        w, h = position[2], position[3]
+        if not exact and border:
+            x, y = x - border, y - border
+            w, h = w + 2 * border, h + 2 * border
+        return ImageOps.fit(img, (w, h), Image.LANCZOS), (x, y)
+
+    # Keep aspect, scale to the slot height
+    new_width = int(slot_h * img.width / img.height)
+    resized = img.resize((new_width, slot_h), Image.LANCZOS)
+    if border:
+        resized = ImageOps.expand(resized, border=border, fill="white")
+    return resized, (x, y)
+
+
+# -------------------------------------------------------------------
+# PRINT RESOLUTION (banded, bounded memory)
+# -------------------------------------------------------------------
+BAND_HEIGHT = 256   # output rows composited at a time
+
+
+class Layer(NamedTuple):
+    """A source region scaled into an output rectangle.
+
+    Layers are drawn in list order; `masked` layers use their alpha.
+    """
+    image: Image.Image
+    box: Tuple[float, float, float, float]   # source (left, top, right, bottom)
+    dest: Tuple[int, int, int, int]          # output (x, y, w, h)
+    masked: bool = False
+
+
+def print_size_px(size_in: Tuple[float, float], dpi: int) -> Tuple[int, int]:
+    """Pixel size of a (width, height) print in inches at `dpi`."""
+    return round(size_in[0] * dpi), round(size_in[1] * dpi)
+
+
+def _fit_rect(src_w: float, src_h: float, dest: Tuple[int, int, int, int]) -> Tuple[int, int, int, int]:
+    """Largest rect with the source aspect, centered in `dest` (letterbox)."""
+    x, y, w, h = dest
+    scale = min(w / src_w, h / src_h)
+    fw, fh = round(src_w * scale), round(src_h * scale)
+    return x + (w - fw) // 2, y + (h - fh) // 2, fw, fh
+
+
+def _cover_box(src_w: int, src_h: int, w: int, h: int) -> Tuple[float, float, float, float]:
+    """Center-crop box of the source with the w:h aspect (like ImageOps.fit)."""
+    ratio = w / h
+    if src_w / src_h > ratio:
+        crop_w = src_h * ratio
+        left = (src_w - crop_w) / 2
+        return left, 0, left + crop_w, src_h
+    crop_h = src_w / ratio
+    top = (src_h - crop_h) / 2
+    return 0, top, src_w, top + crop_h
+
+
+def strip_layers(
+    photos: Sequence[Optional[Image.Image]],
+    design_source: Optional[Image.Image],
+    slots: Sequence[Tuple[float, float, float, float]],
+    photos_on_top: bool,
+    dest: Tuple[int, int, int, int],
+    overlap: int = PHOTO_BORDER,
+) -> List[Layer]:
+    """Layers for one strip drawn into `dest`, at any output resolution.
+
+    `slots` are fractions of the design (see frame_layouts.py), so positions
+    scale with the output. `design_source` is the rotated, full-resolution
+    design; the strip is letterboxed to keep its aspect.
+    """
+    if design_source is not None:
+        dest = _fit_rect(design_source.width, design_source.height, dest)
+    x0, y0, dw, dh = dest
+
+    photo_layers = []
+    for img, (fx, fy, fw, fh) in zip(photos, slots):
+        if img is None:
+            continue
+        sx, sy = x0 + round(fx * dw), y0 + round(fy * dh)
+        sw, sh = round(fw * dw), round(fh * dh)
+        if not photos_on_top:
+            # Holes: tuck the photo edges under the frame
+            sx, sy, sw, sh = sx - overlap, sy - overlap, sw + 2 * overlap, sh + 2 * overlap
+        photo_layers.append(Layer(img, _cover_box(img.width, img.height, sw, sh), (sx, sy, sw, sh)))
+
+    if design_source is None:
+        return photo_layers
+
+    frame = Layer(design_source, (0, 0, design_source.width, design_source.height), dest, True)
+    return [frame] + photo_layers if photos_on_top else photo_layers + [frame]
+
+
+def render_layers(
+    layers: Sequence[Layer],
+    size: Tuple[int, int],
+    output_path: Optional[Path] = None,
+    dpi: Optional[int] = None,
+    band_height: int = BAND_HEIGHT,
+    compress_level: int = 6,
+) -> Optional[Image.Image]:
+    """Composite `layers` onto a white RGB image of `size`, band by band.
+
+    Each layer is resampled straight from its source for just the rows of
+    the current band, so peak memory is the sources plus one band (and the
+    output itself unless `output_path` is given, in which case bands are
+    streamed to a PNG and None is returned).
+    """
+    width, height = size
+    out = None if output_path is not None else Image.new("RGB", size, "white")
+    writer = (_PNGBandWriter(output_path, size, dpi, compress_level)
+              if output_path is not None else None)
+
+    complete = False
+    try:
+        for band_y in range(0, height, band_height):
+            band_h = min(band_height, height - band_y)
+            band = Image.new("RGB", (width, band_h), "white")
+
+            for layer in layers:
+                dx, dy, dw, dh = layer.dest
+                top, bottom = max(band_y, dy), min(band_y + band_h, dy + dh)
+                left, right = max(0, dx), min(width, dx + dw)
+                if top >= bottom or left >= right:
+                    continue
+
+                bl, bt, br, bb = layer.box
+                sx = (br - bl) / dw
+                sy = (bb - bt) / dh
+                box = (
+                    bl + (left - dx) * sx,
+                    bt + (top - dy) * sy,
+                    bl + (right - dx) * sx,
+                    bt + (bottom - dy) * sy,
+                )
+                piece = layer.image.resize((right - left, bottom - top), Image.LANCZOS, box=box)
+                if layer.masked and piece.mode == "RGBA":
+                    band.paste(piece, (left, top - band_y), piece)
+                else:
+                    band.paste(piece.convert("RGB"), (left, top - band_y))
+
+            if writer is not None:
+                writer.write(band)
+            else:
+                out.paste(band, (0, band_y))
+        complete = True
+    finally:
+        if writer is not None:
+            writer.close(complete)
+
+    if out is not None and dpi:
+        out.info["dpi"] = (dpi, dpi)
+    return out
+
+
+def render_print(
+    photos: Sequence[Optional[Image.Image]],
+    design: Optional[FrameDesign],
+    slots: Sequence[Tuple[float, float, float, float]],
+    size_in: Tuple[float, float] = (6, 4),
+    dpi: int = 300,
+    output_path: Optional[Path] = None,
+    compress_level: int = 6,
+) -> Optional[Image.Image]:
+    """Render one strip as a `size_in` print at `dpi`.
+
+    With `output_path` the print is streamed to a PNG there (see render_layers).
+    """
+    size = print_size_px(size_in, dpi)
+    source = design.source() if design is not None else None   # decoded once per design
+    on_top = design is not None and design.photos_on_top
+    overlap = max(1, round(PHOTO_BORDER * dpi / 100))
+    layers = strip_layers(photos, source, slots, on_top, (0, 0) + size, overlap)
+    return render_layers(layers, size, output_path, dpi, compress_level=compress_level)
+
+
+def render_sheet(
+    strips: Sequence[Tuple[Sequence[Optional[Image.Image]], Optional[FrameDesign],
+                           Sequence[Tuple[float, float, float, float]]]],
+    columns: int,
+    output_path: Path,
+    strip_in: Tuple[float, float] = (6, 4),
+    dpi: int = 300,
+    gap_in: float = 0.125,
+    compress_level: int = 6,
+) -> Path:
+    """Lay several (photos, design, slots) strips out on one sheet, in a grid.
+
+    The sheet is always streamed to a PNG at `output_path`: peak memory is
+    the photos, one source per design and one band, however many strips.
+    """
+    cell_w, cell_h = print_size_px(strip_in, dpi)
+    gap = round(gap_in * dpi)
+    rows = -(-len(strips) // columns)
+    size = (
+        columns * cell_w + (columns + 1) * gap,
+        rows * cell_h + (rows + 1) * gap,
+    )
+    overlap = max(1, round(PHOTO_BORDER * dpi / 100))
+
+    layers: List[Layer] = []
+    for i, (photos, design, slots) in enumerate(strips):
+        row, col = divmod(i, columns)
+        cell = (gap + col * (cell_w + gap), gap + row * (cell_h + gap), cell_w, cell_h)
+        source = design.source() if design is not None else None   # shared per design
+        on_top = design is not None and design.photos_on_top
+        layers.extend(strip_layers(photos, source, slots, on_top, cell, overlap))
+
+    render_layers(layers, size, Path(output_path), dpi, compress_level=compress_level)
+    return Path(output_path)
+
+
+class _PNGBandWriter:
+    """Streams RGB bands into a PNG file without holding the whole image.
+
+    Writes to a PARTIAL_SUFFIX temp name and renames on close().
+    """
+
+    def __init__(self, path: Path, size: Tuple[int, int], dpi: Optional[int] = None,
+                 level: int = 6):
+        self.width, self.height = size
+        self.path = Path(path)
+        self._tmp = self.path.with_name(self.path.name + PARTIAL_SUFFIX)
+        self._file = open(self._tmp, "wb")
+        self._zlib = zlib.compressobj(level)
+        self._prev = np.zeros(self.width * 3, dtype=np.uint8)
+
+        self._file.write(b"\x89PNG\r\n\x1a\n")
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", self.width, self.height, 8, 2, 0, 0, 0))
+        if dpi:
+            ppm = round(dpi / 0.0254)
+            self._chunk(b"pHYs", struct.pack(">IIB", ppm, ppm, 1))
+
+    def _chunk(self, kind: bytes, data: bytes):
+        self._file.write(struct.pack(">I", len(data)))
+        self._file.write(kind + data)
+        self._file.write(struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF))
+
+    def write(self, band: Image.Image):
+        rows = np.asarray(band, dtype=np.uint8).reshape(band.height, self.width * 3)
+        # PNG "Up" filter (type 2): each row minus the row above, mod 256
+        above = np.vstack([self._prev[None, :], rows[:-1]])
+        filtered = np.empty((band.height, self.width * 3 + 1), dtype=np.uint8)
+        filtered[:, 0] = 2
+        filtered[:, 1:] = rows - above
+        self._prev = rows[-1].copy()
+
+        data = self._zlib.compress(filtered.tobytes())
+        if data:
+            self._chunk(b"IDAT", data)
+
+    def close(self, complete: bool = True):
+        if self._file.closed:
+            return
+        if not complete:
+            self._file.close()
+            self._tmp.unlink(missing_ok=True)
+            return
+        self._chunk(b"IDAT", self._zlib.flush())
+        self._chunk(b"IEND", b"")
+        self._file.close()
+        os.replace(self._tmp, self.path)
+
+
+# -------------------------------------------------------------------
+# BATCH MODE (process pool)
+# -------------------------------------------------------------------
+class StripSpec(NamedTuple):
+    """One strip for render_batch(). Set output_path to write it in the worker."""
+    photos: List[Optional[Image.Image]]
+    design_path: Optional[Path]
+    positions: List[Tuple[int, int]]
+    output_path: Optional[Path] = None
+
+
+# Per-process design cache, filled lazily by _render_spec
+_worker_designs: Optional[FrameDesignCache] = None
+
+
+def _init_worker(design_dir: Path, canvas_size: Tuple[int, int],
+                 layout_index_path: Optional[Path]):
+    global _worker_designs
+    # Same detected windows (and photos-on-top for white windows) as the app
+    index = LayoutIndex(layout_index_path) if layout_index_path is not None else None
+    _worker_designs = FrameDesignCache(design_dir, *canvas_size, layout_index=index)
+
+
+def _render_spec(spec: StripSpec, canvas_size: Tuple[int, int],
+                 slot_h: int) -> Union[Image.Image, Path]:
+    design = None
+    if spec.design_path is not None:
+        design = _worker_designs.get(Path(spec.design_path))
+
+    strip = composite_strip(spec.photos, design, spec.positions, canvas_size, slot_h)
+    if spec.output_path is None:
+        return strip
+
+    output_path = Path(spec.output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with atomic_write(output_path) as tmp:
+        strip.save(tmp, Image.registered_extensions()[output_path.suffix.lower()])
+    return output_path
+
+
+def render_batch(
+    specs: Iterable[StripSpec],
+    design_dir: Path,
+    canvas_size: Tuple[int, int],
+    slot_h: int,
+    processes: Optional[int] = None,
+    layout_index_path: Optional[Path] = None,
+) -> List[Union[Image.Image, Path]]:
+    """Render many strips in parallel; results come back in input order.
+
+    Each worker process decodes a design at most once. Specs with an
+    output_path are written by the worker and return the path, which avoids
+    sending the finished pixels back to this process. Pass the app's
+    `layout_index_path` so designs with white windows get photos on top.
+    """
+    specs = list(specs)
+    if not specs:
+        return []
+
+    if layout_index_path is not None:
+        # Detect any new designs here, once (on the same pixels as the app),
+        # so workers only read the index
+        designs = FrameDesignCache(Path(design_dir), *canvas_size,
+                                   layout_index=LayoutIndex(Path(layout_index_path)))
+        for path in {Path(s.design_path) for s in specs if s.design_path is not None}:
+            designs.get(path)
+
+    with ProcessPoolExecutor(
+        max_workers=processes,
+        initializer=_init_worker,
+        initargs=(Path(design_dir), canvas_size,
+                  Path(layout_index_path) if layout_index_path is not None else None),
+    ) as pool:
+        futures = [pool.submit(_render_spec, s, canvas_size, slot_h) for s in specs]
+        return [f.result() for f in futures]
@@ -0,0 +1,114 @@
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+from PIL import Image
+
+
+# -------------------------------------------------------------------
+# ATOMIC WRITES
+# -------------------------------------------------------------------
+PARTIAL_SUFFIX = ".part"   # in-progress files; watchers must ignore these
+
+
+@contextmanager
+def atomic_write(path: Path) -> Iterator[Path]:
+    """Yield a temp path next to `path`; rename it into place on success.
+
+    Readers (e.g. the upload watcher) only ever see the finished file.
+    """
+    path = Path(path)
+    tmp = path.with_name(path.name + PARTIAL_SUFFIX)
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+# -------------------------------------------------------------------
+# ENCODERS
+# -------------------------------------------------------------------
+class Encoder(NamedTuple):
+    """A Pillow output format plus its save() options."""
+    format: str       # Pillow format name
+    extension: str
+    options: dict
+
+    def save(self, image: Image.Image, path: Path) -> Path:
+        """Write `image` with this encoder; the suffix of `path` is replaced."""
+        path = Path(path).with_suffix(self.extension)
+        if self.format == "JPEG" and image.mode != "RGB":
+            image = _flatten(image)
+
+        options = dict(self.options)
+        if "dpi" in image.info:
+            options.setdefault("dpi", image.info["dpi"])
+        with atomic_write(path) as tmp:
+            image.save(tmp, self.format, **options)
+        return path
+
+
+def _flatten(image: Image.Image) -> Image.Image:
+    """RGB copy with any transparency composited onto white."""
+    if image.mode != "RGBA":
+        return image.convert("RGB")
+    flat = Image.new("RGB", image.size, "white")
+    flat.paste(image, mask=image.getchannel("A"))
+    return flat
+
+
+def png(compress_level: int = 6, optimize: bool = False) -> Encoder:
+    return Encoder("PNG", ".png", {"compress_level": compress_level, "optimize": optimize})
+
+
+def jpeg(quality: int = 90, subsampling: str = "4:2:0", progressive: bool = False) -> Encoder:
+    return Encoder(
+        "JPEG",
+        ".jpg",
+        {"quality": quality, "subsampling": subsampling, "progressive": progressive},
+    )
+
+
+def webp(quality: int = 85, lossless: bool = False, method: int = 4) -> Encoder:
+    return Encoder("WEBP", ".webp", {"quality": quality, "lossless": lossless, "method": method})
+
+
+# Named settings for config files and the benchmark
+ENCODER_PRESETS: Dict[str, Encoder] = {
+    "png": png(),
+    "png-fast": png(compress_level=1),
+    "png-small": png(compress_level=9, optimize=True),
+    "jpeg": jpeg(),
+    "jpeg-hq": jpeg(quality=95, subsampling="4:4:4"),
+    "jpeg-small": jpeg(quality=80, progressive=True),
+    "webp": webp(),
+    "webp-fast": webp(method=0),
+    "webp-lossless": webp(quality=80, lossless=True, method=2),
+}
+
+
+def get_encoder(name: str) -> Encoder:
+    try:
+        return ENCODER_PRESETS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown encoder {name!r}; choose from {', '.join(ENCODER_PRESETS)}"
+        ) from None
+
+
+def write_outputs(image: Image.Image, path: Path, share: Encoder,
+                  master: Optional[Encoder] = None) -> List[Path]:
+    """Write the share copy and, optionally, a lossless master next to it.
+
+    The master gets a "_master" suffix when both would use the same name.
+    """
+    written = [share.save(image, path)]
+    if master is not None:
+        master_path = Path(path).with_suffix(master.extension)
+        if master_path == written[0]:
+            master_path = master_path.with_name(f"{master_path.stem}_master{master.extension}")
+        written.append(master.save(image, master_path))
+    return written
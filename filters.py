@@ -0,0 +1,121 @@
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, NamedTuple, Optional
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from memory_stats import image_bytes
+
+
+# -------------------------------------------------------------------
+# FILTER DEFINITIONS
+# -------------------------------------------------------------------
+class PhotoFilter(NamedTuple):
+    """A colour look: an optional 3x3 RGB matrix, then optional per-channel curves.
+
+    Both run as single vectorized passes (cv2.transform / cv2.LUT) and
+    saturate to uint8, so cost is a few ms per megapixel.
+    """
+
+    label: str
+    matrix: Optional[np.ndarray] = None   # 3x3 float32, out = matrix @ rgb
+    lut: Optional[np.ndarray] = None      # (1, 256, 3) uint8, one curve per channel
+
+    def apply_array(self, rgb: np.ndarray) -> np.ndarray:
+        """Filtered copy of an (H, W, 3) uint8 RGB array (or the array itself for no-ops)."""
+        out = rgb
+        if self.matrix is not None:
+            out = cv2.transform(out, self.matrix)
+        if self.lut is not None:
+            out = cv2.LUT(out, self.lut)
+        return out
+
+
+def _curve(fn: Callable[[np.ndarray], np.ndarray]) -> np.ndarray:
+    x = np.arange(256, dtype=np.float32) / 255
+    return np.clip(np.round(fn(x) * 255), 0, 255).astype(np.uint8)
+
+
+def _curves(r, g=None, b=None) -> np.ndarray:
+    """(1, 256, 3) LUT from one curve per channel (g and b default to r)."""
+    channels = [_curve(r), _curve(g or r), _curve(b or r)]
+    return np.stack(channels, axis=-1)[None, :, :]
+
+
+_GRAY = [0.299, 0.587, 0.114]
+_SEPIA = np.array([[0.393, 0.769, 0.189],
+                   [0.349, 0.686, 0.168],
+                   [0.272, 0.534, 0.131]], np.float32)
+
+
+FILTERS: Dict[str, PhotoFilter] = {
+    "none": PhotoFilter("Original"),
+    "bw": PhotoFilter("B&W", matrix=np.array([_GRAY] * 3, np.float32)),
+    "sepia": PhotoFilter("Sepia", matrix=_SEPIA),
+    "warm": PhotoFilter("Warm", lut=_curves(lambda x: x ** 0.88, lambda x: x ** 0.97,
+                                            lambda x: x ** 1.15)),
+    "cool": PhotoFilter("Cool", lut=_curves(lambda x: x ** 1.15, lambda x: x ** 1.0,
+                                            lambda x: x ** 0.88)),
+    "contrast": PhotoFilter("High contrast",
+                            lut=_curves(lambda x: (x - 0.5) * 1.6 + 0.5)),
+    "vintage": PhotoFilter(
+        "Vintage",
+        matrix=(0.6 * _SEPIA + 0.4 * np.eye(3, dtype=np.float32)).astype(np.float32),
+        # Lifted blacks and soft highlights, slightly more in blue
+        lut=_curves(lambda x: 0.06 + 0.86 * x, lambda x: 0.05 + 0.85 * x,
+                    lambda x: 0.12 + 0.74 * x),
+    ),
+}
+
+
+def apply_filter(img: Image.Image, name: str) -> Image.Image:
+    """`img` with filter `name`; "none" returns the same object (no copy)."""
+    look = FILTERS[name]
+    if look.matrix is None and look.lut is None:
+        return img
+    rgb = np.asarray(img.convert("RGB") if img.mode != "RGB" else img)
+    return Image.fromarray(look.apply_array(rgb))
+
+
+# -------------------------------------------------------------------
+# RESULT CACHE
+# -------------------------------------------------------------------
+class FilterCache:
+    """Filtered images keyed by (capture, filter, size), least recently used first out.
+
+    Bounded by pixel bytes rather than entries, since a full-resolution
+    result weighs as much as hundreds of thumbnails. Tk thread only.
+    """
+
+    def __init__(self, max_bytes: int = 64_000_000):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries: "OrderedDict[Hashable, Image.Image]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, make: Callable[[], Image.Image]) -> Image.Image:
+        img = self._entries.get(key)
+        if img is not None:
+            self._entries.move_to_end(key)
+            return img
+
+        img = make()
+        size = image_bytes(img)
+        if size > self.max_bytes:
+            return img   # too big to keep; don't flush everything else for it
+        self._entries[key] = img
+        self.nbytes += size
+        while self.nbytes > self.max_bytes:
+            _, old = self._entries.popitem(last=False)
+            self.nbytes -= image_bytes(old)
+        return img
+
+    def values(self) -> List[Image.Image]:
+        return list(self._entries.values())
+
+    def clear(self):
+        self._entries.clear()
+        self.nbytes = 0
@@ -0,0 +1,246 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from frame_layouts import LayoutIndex, Slot, slots_to_pixels
+
+
+# -------------------------------------------------------------------
+# HELPER FUNCTIONS
+# -------------------------------------------------------------------
+def resize_to_fit(image: Image.Image, target_width: int, target_height: int) -> Image.Image:
+    """Resize background to (almost) fit canvas while keeping aspect ratio,
+    and rotate 90 degrees like your original code."""
+    img_width, img_height = image.size
+    img_aspect = img_width / img_height
+    target_aspect = target_width / target_height
+
+    if img_aspect > target_aspect:
+        new_width = target_width
+        new_height = int(target_width / img_aspect)
+    else:
+        new_height = target_height
+        new_width = int(target_height * img_aspect)
+
+    resized_image = image.resize((int(new_width * 0.9), int(new_height * 0.9)))
+    resized_image = resized_image.rotate(90, expand=True)
+    return resized_image
+
+
+def load_design_source(path: Path) -> Image.Image:
+    """Full-resolution design, rotated like resize_to_fit (for print output)."""
+    with Image.open(path) as img:
+        return img.convert("RGBA").rotate(90, expand=True)
+
+
+# -------------------------------------------------------------------
+# FRAME DESIGN CACHE
+# -------------------------------------------------------------------
+class FrameDesign:
+    """One decoded frame design, prepared once and shared by display and save."""
+
+    def __init__(self, path: Path, rgba: Image.Image, thumb_size: int = 120,
+                 slots: Optional[List[Slot]] = None, slot_kind: str = "none",
+                 thumb: Optional[Image.Image] = None):
+        self.path = path
+        self.rgba = rgba                    # rotated, at save resolution
+        self.alpha = rgba.getchannel("A")   # paste mask (photos show through holes)
+        if thumb is None:
+            thumb = rgba.copy()
+            thumb.thumbnail((thumb_size, thumb_size))
+        self.thumb = thumb
+
+        # Photo windows as fractions of the design (see frame_layouts.py).
+        # "alpha" windows are holes, so photos go behind the frame; "white"
+        # windows are opaque, so photos have to be drawn on top.
+        self.slots = list(slots or [])
+        self.slot_kind = slot_kind
+
+        self._source: Optional[Image.Image] = None   # full resolution, see source()
+        self._source_lock = threading.Lock()
+
+    @property
+    def size(self):
+        return self.rgba.size
+
+    @property
+    def photos_on_top(self) -> bool:
+        return self.slot_kind == "white"
+
+    def slot_rects(self) -> List[Tuple[int, int, int, int]]:
+        """Slots as (x, y, w, h) pixels relative to the design's top-left."""
+        return slots_to_pixels(self.slots, self.size)
+
+    @property
+    def display(self) -> Image.Image:
+        """Layout canvas image; same pixels as the save-resolution design."""
+        return self.rgba
+
+    def source(self) -> Image.Image:
+        """Full-resolution rotated design for print output, decoded on first use only."""
+        with self._source_lock:
+            if self._source is None:
+                self._source = load_design_source(self.path)
+            return self._source
+
+    def images(self) -> List[Image.Image]:
+        """Every image this design holds (for memory accounting)."""
+        held = [self.rgba, self.alpha, self.thumb]
+        if self._source is not None:
+            held.append(self._source)
+        return held
+
+
+class FrameDesignCache:
+    """Decodes each frame_designs/N.png at most once per process.
+
+    With a DesignBundle, load_all() maps pre-baked pixels instead and only
+    decodes designs whose source file changed since the bundle was built.
+    """
+
+    def __init__(self, directory: Path, width: int, height: int,
+                 layout_index: Optional[LayoutIndex] = None,
+                 bundle: Optional["DesignBundle"] = None):
+        self.directory = Path(directory)
+        self.width = width
+        self.height = height
+        self.layout_index = layout_index
+        self.bundle = bundle
+        self._designs: Dict[Path, FrameDesign] = {}
+        # get() runs on the Tk thread and the save worker; one build per design
+        self._lock = threading.Lock()
+
+    def design_paths(self) -> List[Path]:
+        """All *.png designs, numbered ones first in numeric order."""
+        paths = self.directory.glob("*.png")
+        return sorted(paths, key=lambda p: (not p.stem.isdigit(), int(p.stem) if p.stem.isdigit() else 0, p.stem))
+
+    def get(self, path: Path) -> FrameDesign:
+        with self._lock:
+            design = self._designs.get(path)
+            if design is None:
+                with Image.open(path) as img:
+                    rgba = resize_to_fit(img.convert("RGBA"), self.width, self.height)
+
+                slots, kind = [], "none"
+                if self.layout_index is not None:
+                    # Detected on the pixels just decoded, not a second decode
+                    slots, kind = self.layout_index.lookup(path, rgba)
+                design = FrameDesign(path, rgba, slots=slots, slot_kind=kind)
+                self._designs[path] = design
+            return design
+
+    def load_all(self) -> List[FrameDesign]:
+        paths = self.design_paths()
+        if self.bundle is None:
+            return [self.get(p) for p in paths]
+
+        baked = self.bundle.load(paths, self.width, self.height)
+        with self._lock:
+            for path, design in baked.items():
+                self._designs.setdefault(path, design)
+        designs = [self.get(p) for p in paths]
+        if len(baked) < len(paths):
+            self.bundle.save(designs, self.width, self.height)   # re-bake changed designs
+        return designs
+
+    def clear(self, path: Optional[Path] = None):
+        with self._lock:
+            if path is None:
+                self._designs.clear()
+            else:
+                self._designs.pop(path, None)
+
+
+# -------------------------------------------------------------------
+# PRE-BAKED BUNDLE
+# -------------------------------------------------------------------
+class DesignBundle:
+    """Rotated/resized design pixels and thumbnails baked into one raw file.
+
+    Layout: an 8-byte manifest length, the JSON manifest (per design: pixel
+    offsets and sizes, detected slots, the source file's size/mtime), then
+    uncompressed RGBA bytes. Loading memory-maps the file, so startup skips
+    PNG decode, resize and rotate for every design that has not changed.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    @staticmethod
+    def _source_key(path: Path) -> List[int]:
+        st = os.stat(path)
+        return [st.st_size, st.st_mtime_ns]
+
+    def _open(self, width: int, height: int) -> Tuple[dict, Optional[np.memmap]]:
+        try:
+            raw = np.memmap(self.path, dtype=np.uint8, mode="r")
+            header = int.from_bytes(raw[:8].tobytes(), "little")
+            manifest = json.loads(raw[8:8 + header].tobytes())
+        except (OSError, ValueError):
+            return {}, None
+        if manifest.get("version") != self.VERSION or manifest.get("canvas") != [width, height]:
+            return {}, None
+        return manifest["designs"], raw[8 + header:]
+
+    def load(self, paths: List[Path], width: int, height: int) -> Dict[Path, FrameDesign]:
+        """Designs whose baked entry is still current; changed ones are left out."""
+        entries, pixels = self._open(width, height)
+        designs = {}
+        for path in paths:
+            entry = entries.get(path.name)
+            try:
+                if entry is None or entry["source"] != self._source_key(path):
+                    continue
+            except OSError:
+                continue
+            designs[path] = FrameDesign(
+                path,
+                _mapped_image(pixels, entry["rgba"]),
+                slots=[tuple(s) for s in entry["slots"]],
+                slot_kind=entry["slot_kind"],
+                thumb=_mapped_image(pixels, entry["thumb"]),
+            )
+        return designs
+
+    def save(self, designs: List[FrameDesign], width: int, height: int):
+        """Write all `designs` to a fresh bundle, atomically replacing the old one."""
+        entries, chunks = {}, []
+        offset = 0
+        for design in designs:
+            entry = {"source": self._source_key(design.path),
+                     "slots": [list(s) for s in design.slots],
+                     "slot_kind": design.slot_kind}
+            for key, img in (("rgba", design.rgba), ("thumb", design.thumb)):
+                data = img.convert("RGBA").tobytes()
+                chunks.append(data)
+                entry[key] = [offset, img.width, img.height]
+                offset += len(data)
+            entries[design.path.name] = entry
+
+        manifest = {"version": self.VERSION, "canvas": [width, height], "designs": entries}
+        header = json.dumps(manifest).encode()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        try:
+            with open(tmp, "wb") as f:
+                f.write(len(header).to_bytes(8, "little"))
+                f.write(header)
+                for data in chunks:
+                    f.write(data)
+            os.replace(tmp, self.path)
+        except OSError as e:   # e.g. the old bundle is still mapped on Windows
+            tmp.unlink(missing_ok=True)
+            print(f"Could not update design bundle {self.path}: {e}")
+
+
+def _mapped_image(pixels: np.memmap, spec: List[int]) -> Image.Image:
+    offset, w, h = spec
+    return Image.frombuffer("RGBA", (w, h), pixels[offset:offset + w * h * 4], "raw", "RGBA", 0, 1)
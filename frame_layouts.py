@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image
+
+# A slot is (x, y, w, h) as fractions of the rotated design size, so the
+# same layout works at display, save and print resolution.
+Slot = Tuple[float, float, float, float]
+
+HOLE_ALPHA = 128          # alpha below this counts as a transparent window
+WHITE_LEVEL = 245         # fallback: opaque near-white windows
+MIN_SLOT_AREA = 0.01      # fraction of the design area
+MIN_SLOT_FILL = 0.9       # region area / bounding box area (windows are boxes)
+
+
+# -------------------------------------------------------------------
+# DETECTION
+# -------------------------------------------------------------------
+def _regions(mask: np.ndarray) -> List[Tuple[int, int, int, int]]:
+    """Bounding boxes of the box-shaped connected regions in `mask`."""
+    h, w = mask.shape
+    n, _, stats, _ = cv2.connectedComponentsWithStats(mask.astype(np.uint8), connectivity=4)
+    if n <= 1:
+        return []
+
+    stats = stats[1:]   # label 0 is the background
+    x, y, bw, bh, area = stats.T
+    keep = (
+        (area >= MIN_SLOT_AREA * w * h)
+        & (area >= MIN_SLOT_FILL * bw * bh)
+        & (x > 0) & (y > 0) & (x + bw < w) & (y + bh < h)   # not the outer margin
+    )
+    return [tuple(int(v) for v in s[:4]) for s in stats[keep]]
+
+
+def _reading_order(boxes: List[Tuple[int, int, int, int]]) -> List[Tuple[int, int, int, int]]:
+    """Sort boxes into rows (top to bottom), then left to right in each row."""
+    rows: List[List[Tuple[int, int, int, int]]] = []
+    for box in sorted(boxes, key=lambda b: b[1]):
+        if rows and abs(box[1] - rows[-1][0][1]) < rows[-1][0][3] / 2:
+            rows[-1].append(box)
+        else:
+            rows.append([box])
+    return [b for row in rows for b in sorted(row, key=lambda b: b[0])]
+
+
+def detect_slots(rgba: np.ndarray) -> Tuple[List[Slot], str]:
+    """Find photo windows in an HxWx4 design array.
+
+    Transparent holes are used when present; otherwise opaque near-white
+    boxes are taken as the windows. Returns (slots, kind) with kind "alpha",
+    "white" or "none".
+    """
+    h, w = rgba.shape[:2]
+    alpha = rgba[..., 3]
+
+    boxes = _regions(alpha < HOLE_ALPHA)
+    kind = "alpha"
+    if not boxes:
+        boxes = _regions((rgba[..., :3] >= WHITE_LEVEL).all(axis=2) & (alpha >= HOLE_ALPHA))
+        kind = "white"
+    if not boxes:
+        return [], "none"
+
+    slots = [(x / w, y / h, bw / w, bh / h) for x, y, bw, bh in _reading_order(boxes)]
+    return slots, kind
+
+
+def slots_to_pixels(slots: List[Slot], size: Tuple[int, int]) -> List[Tuple[int, int, int, int]]:
+    """Scale fractional slots to (x, y, w, h) pixels for a design of `size`."""
+    w, h = size
+    return [
+        (round(fx * w), round(fy * h), round(fw * w), round(fh * h))
+        for fx, fy, fw, fh in slots
+    ]
+
+
+# -------------------------------------------------------------------
+# PER-DESIGN INDEX (keyed by file hash)
+# -------------------------------------------------------------------
+def file_hash(path: Path) -> str:
+    return hashlib.sha1(Path(path).read_bytes()).hexdigest()
+
+
+class LayoutIndex:
+    """JSON index of detected slots, so each design is analysed only once.
+
+    Layouts are keyed by file hash; a stat cache (path -> size, mtime, hash)
+    means unchanged designs are not even re-read to hash them.
+    """
+
+    def __init__(self, index_path: Path):
+        self.index_path = Path(index_path)
+        self._entries: Dict[str, dict] = {}
+        self._files: Dict[str, list] = {}
+        if self.index_path.exists():
+            try:
+                data = json.loads(self.index_path.read_text())
+            except (OSError, ValueError):
+                data = {}
+            if "layouts" in data:
+                self._entries = data["layouts"]
+                self._files = data.get("files", {})
+            else:
+                self._entries = data   # older index: layouts only
+
+    def _key(self, path: Path) -> Tuple[str, bool]:
+        """(file hash, whether it had to be computed) for `path`.
+
+        The hash comes from the stat cache when size and mtime match.
+        """
+        st = os.stat(path)
+        cached = self._files.get(str(path))
+        if cached is not None and cached[:2] == [st.st_size, st.st_mtime_ns]:
+            return cached[2], False
+        key = file_hash(path)
+        self._files[str(path)] = [st.st_size, st.st_mtime_ns, key]
+        return key, True
+
+    def lookup(self, path: Path, rotated: Optional[Image.Image] = None) -> Tuple[List[Slot], str]:
+        """Slots for the design at `path`; `rotated` is analysed on a miss.
+
+        Pass the rotated design if it is already decoded; otherwise a miss
+        decodes the file here.
+        """
+        key, hashed = self._key(path)
+        entry = self._entries.get(key)
+        if entry is None:
+            if rotated is None:
+                with Image.open(path) as img:
+                    rotated = img.convert("RGBA").rotate(90, expand=True)
+            slots, kind = detect_slots(np.asarray(rotated.convert("RGBA")))
+            entry = {"name": Path(path).name, "kind": kind, "slots": slots}
+            self._entries[key] = entry
+            self._write()
+        elif hashed:
+            self._write()   # only the stat cache changed
+
+        return [tuple(s) for s in entry["slots"]], entry["kind"]
+
+    def _write(self):
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            data = {"layouts": self._entries, "files": self._files}
+            self.index_path.write_text(json.dumps(data, indent=2))
+        except OSError as e:
+            print(f"Could not write layout index {self.index_path}: {e}")
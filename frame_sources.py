@@ -0,0 +1,219 @@
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".webp")
+
+
+# -------------------------------------------------------------------
+# SOURCE INTERFACE
+# -------------------------------------------------------------------
+class FrameSource:
+    """The part of cv2.VideoCapture the app uses: isOpened/read/release.
+
+    read() returns (ok, BGR frame) like OpenCV, so FrameGrabber and
+    test_cam.py work the same on a webcam, a file or generated frames.
+    """
+
+    name = "base"
+
+    def isOpened(self) -> bool:
+        return True
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        raise NotImplementedError
+
+    def release(self):
+        pass
+
+
+class _Pacer:
+    """Sleeps so read() returns at most `fps` frames per second (None: unpaced)."""
+
+    def __init__(self, fps: Optional[float]):
+        self.interval = 1.0 / fps if fps else 0.0
+        self._next = time.monotonic()
+
+    def wait(self):
+        if not self.interval:
+            return
+        now = time.monotonic()
+        if self._next > now:
+            time.sleep(self._next - now)
+        # Don't try to catch up after a stall; keep a steady rate from here
+        self._next = max(self._next, now) + self.interval
+
+
+# -------------------------------------------------------------------
+# BACKENDS
+# -------------------------------------------------------------------
+class DeviceSource(FrameSource):
+    """A live camera. Asking for a huge `request_size` gets the full sensor
+    resolution, since drivers pick the closest mode they support."""
+
+    name = "device"
+
+    def __init__(self, index: int = 0, request_size: Optional[Tuple[int, int]] = None):
+        self.cap = cv2.VideoCapture(index)
+        if request_size is not None and self.cap.isOpened():
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, request_size[0])
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, request_size[1])
+
+    def isOpened(self) -> bool:
+        return self.cap.isOpened()
+
+    def read(self):
+        return self.cap.read()
+
+    def release(self):
+        self.cap.release()
+
+
+class VideoFileSource(FrameSource):
+    """Replays a video file at its own frame rate (or `fps`), looping."""
+
+    name = "video"
+
+    def __init__(self, path: Path, fps: Optional[float] = None, loop: bool = True):
+        self.path = str(path)
+        self.loop = loop
+        self.cap = cv2.VideoCapture(self.path)
+        self._pacer = _Pacer(fps or self.cap.get(cv2.CAP_PROP_FPS) or 30)
+
+    def isOpened(self) -> bool:
+        return self.cap.isOpened()
+
+    def read(self):
+        self._pacer.wait()
+        ok, frame = self.cap.read()
+        if not ok and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self.cap.read()
+        return ok, frame
+
+    def release(self):
+        self.cap.release()
+
+
+class ImageDirectorySource(FrameSource):
+    """Replays a folder of stills in name order at a fixed `fps`, looping.
+
+    Up to `cache_frames` decoded stills are kept, so a short sequence costs
+    no decoding after the first pass.
+    """
+
+    name = "dir"
+
+    def __init__(self, directory: Path, fps: float = 30, loop: bool = True,
+                 cache_frames: int = 64):
+        self.paths: List[Path] = sorted(
+            p for p in Path(directory).iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS
+        )
+        self.loop = loop
+        self.cache_frames = cache_frames
+        self._cache = {}
+        self._index = 0
+        self._pacer = _Pacer(fps)
+
+    def isOpened(self) -> bool:
+        return bool(self.paths)
+
+    def read(self):
+        if self._index >= len(self.paths):
+            if not self.loop or not self.paths:
+                return False, None
+            self._index = 0
+
+        self._pacer.wait()
+        i = self._index
+        self._index += 1
+        frame = self._cache.get(i)
+        if frame is None:
+            frame = cv2.imread(str(self.paths[i]), cv2.IMREAD_COLOR)
+            if frame is None:
+                return False, None
+            if len(self._cache) < self.cache_frames:
+                self._cache[i] = frame
+        return True, frame
+
+
+class SyntheticSource(FrameSource):
+    """Generated frames of any size: a moving gradient with a frame counter.
+
+    fps=None reads as fast as possible (throughput tests); otherwise frames
+    are paced like a real camera.
+    """
+
+    name = "synthetic"
+
+    def __init__(self, size: Tuple[int, int] = (1920, 1080), fps: Optional[float] = 30):
+        w, h = size
+        self.size = (w, h)
+        x = np.linspace(0, 255, w, dtype=np.float32)
+        y = np.linspace(0, 255, h, dtype=np.float32)[:, None]
+        base = np.empty((h, w, 3), np.uint8)
+        base[:, :, 0] = x
+        base[:, :, 1] = y
+        base[:, :, 2] = (x + y) / 2
+        self._base = base
+        self._seq = 0
+        self._pacer = _Pacer(fps)
+
+    def read(self):
+        self._pacer.wait()
+        self._seq += 1
+        # np.roll copies, so each frame is a fresh buffer like a driver's
+        frame = np.roll(self._base, (self._seq * 8) % self.size[0], axis=1)
+        cv2.putText(frame, f"#{self._seq}", (20, 60), cv2.FONT_HERSHEY_SIMPLEX,
+                    2, (255, 255, 255), 3, cv2.LINE_AA)
+        return True, frame
+
+
+# -------------------------------------------------------------------
+# CONFIGURATION
+# -------------------------------------------------------------------
+SOURCE_KINDS = {   # kind -> example spec
+    "device": "device:0",
+    "video": "video:clip.mp4",
+    "dir": "dir:stills/@15",
+    "synthetic": "synthetic:1920x1080@30",
+}
+
+
+def open_source(spec: str, request_size: Optional[Tuple[int, int]] = None) -> FrameSource:
+    """Open a source from a config string:
+
+        "device:0"                  webcam 0 (a bare "0" works too)
+        "video:clip.mp4[@fps]"      video file, looped
+        "dir:stills/[@fps]"         folder of images, looped (default 30 fps)
+        "synthetic:1920x1080[@fps]" generated frames; "@0" = unpaced
+                                    (a bare "synthetic" is 1920x1080)
+
+    `request_size` only applies to devices.
+    """
+    kind, _, arg = spec.partition(":")
+    if kind not in SOURCE_KINDS:
+        if arg or not kind.isdigit():
+            raise ValueError(
+                f"Unknown frame source {spec!r} ({', '.join(SOURCE_KINDS)} or a device index)"
+            )
+        kind, arg = "device", kind   # bare device index
+
+    fps = None
+    if "@" in arg:
+        arg, _, fps_text = arg.rpartition("@")
+        fps = float(fps_text)
+
+    if kind == "synthetic":
+        w, _, h = (arg or "1920x1080").partition("x")
+        return SyntheticSource((int(w), int(h)), 30 if fps is None else fps)
+    if not arg:
+        raise ValueError(f"Frame source {spec!r} needs an argument, e.g. {SOURCE_KINDS[kind]!r}")
+    if kind == "device":
+        return DeviceSource(int(arg), request_size)
+    if kind == "video":
+        return VideoFileSource(Path(arg), fps)
+    return ImageDirectorySource(Path(arg), 30 if fps is None else fps)
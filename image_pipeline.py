@@ -0,0 +1,110 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image
+
+
+# -------------------------------------------------------------------
+# PREVIEW QUALITY MODES
+# -------------------------------------------------------------------
+# Interpolation used for the live preview, as (downscale, upscale).
+# Only captured frames get the expensive LANCZOS pass.
+PREVIEW_MODES = {
+    "fast": (cv2.INTER_NEAREST, cv2.INTER_LINEAR),
+    "balanced": (cv2.INTER_AREA, cv2.INTER_LINEAR),
+    "quality": (cv2.INTER_AREA, cv2.INTER_CUBIC),
+}
+DEFAULT_PREVIEW_MODE = "balanced"
+
+
+# -------------------------------------------------------------------
+# ARRAY HELPERS
+# -------------------------------------------------------------------
+def crop_box_for_ratio(w: int, h: int, ratio: float) -> Tuple[int, int, int, int]:
+    """Center-crop box (left, top, right, bottom) giving a w/h of `ratio`."""
+    if w / h > ratio:
+        new_w = int(h * ratio)
+        left = (w - new_w) // 2
+        return left, 0, left + new_w, h
+
+    new_h = int(w / ratio)
+    top = (h - new_h) // 2
+    return 0, top, w, top + new_h
+
+
+def crop_array_to_ratio(frame: np.ndarray, ratio: float) -> np.ndarray:
+    """Center-crop an HxWxC array to `ratio` with a slice (no pixel copy)."""
+    h, w = frame.shape[:2]
+    left, top, right, bottom = crop_box_for_ratio(w, h, ratio)
+    return frame[top:bottom, left:right]
+
+
+def scale_for_preview(frame: np.ndarray, size: Tuple[int, int],
+                      mode: str = DEFAULT_PREVIEW_MODE) -> np.ndarray:
+    """Resize an already-cropped frame to `size` (w, h) with cheap interpolation."""
+    h, w = frame.shape[:2]
+    if (w, h) == tuple(size):
+        return frame
+
+    down, up = PREVIEW_MODES.get(mode, PREVIEW_MODES[DEFAULT_PREVIEW_MODE])
+    interp = down if size[0] < w else up
+    return cv2.resize(frame, size, interpolation=interp)
+
+
+# -------------------------------------------------------------------
+# THUMBNAIL CACHE
+# -------------------------------------------------------------------
+class ThumbnailCache:
+    """Builds thumbnails on a worker thread, keyed by (index, version).
+
+    Bump the version whenever the image at an index changes; older
+    thumbnails for that index are dropped on the next submit().
+    """
+
+    def __init__(self, size: Tuple[int, int], workers: int = 1):
+        self.size = size
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumbs")
+        self._lock = threading.Lock()
+        self._futures: Dict[int, Tuple[int, Future]] = {}
+
+    def _make(self, img: Image.Image) -> Image.Image:
+        return img.resize(self.size, Image.LANCZOS)
+
+    def build(self, img: Image.Image) -> Future:
+        """Start a thumbnail of `img` without caching it; hand it over with adopt()."""
+        return self._executor.submit(self._make, img)
+
+    def submit(self, index: int, version: int, img: Image.Image):
+        self.adopt(index, version, self.build(img))
+
+    def adopt(self, index: int, version: int, future: Future):
+        with self._lock:
+            self._futures[index] = (version, future)
+
+    def get(self, index: int, version: int, wait: bool = True) -> Optional[Image.Image]:
+        """Thumbnail for (index, version); None if unknown or (wait=False) not ready."""
+        with self._lock:
+            entry = self._futures.get(index)
+        if entry is None or entry[0] != version:
+            return None
+
+        future = entry[1]
+        if not wait and not future.done():
+            return None
+        return future.result()
+
+    def images(self) -> List[Image.Image]:
+        """Finished thumbnails (for memory accounting)."""
+        with self._lock:
+            futures = [f for _, f in self._futures.values()]
+        return [f.result() for f in futures if f.done() and f.exception() is None]
+
+    def clear(self):
+        with self._lock:
+            self._futures.clear()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
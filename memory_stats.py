@@ -0,0 +1,69 @@
+import os
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+# Bytes per pixel of Pillow's in-memory storage: everything wider than one
+# byte (RGB included) is kept as 32-bit pixels
+_PIL_PIXEL_BYTES = {"1": 1, "L": 1, "P": 1, "I;16": 2, "I;16L": 2, "I;16B": 2}
+
+
+# -------------------------------------------------------------------
+# SIZES
+# -------------------------------------------------------------------
+def image_bytes(obj) -> int:
+    """Pixel bytes held by a PIL image, NumPy array or Tk PhotoImage (else 0)."""
+    if obj is None:
+        return 0
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, Image.Image):
+        return obj.width * obj.height * _PIL_PIXEL_BYTES.get(obj.mode, 4)
+    width = getattr(obj, "width", None)
+    height = getattr(obj, "height", None)
+    if callable(width) and callable(height):
+        # ImageTk.PhotoImage / tk.PhotoImage: Tk keeps 32-bit pixels
+        try:
+            return width() * height() * 4
+        except Exception:
+            return 0   # Tk image already deleted
+    return 0
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Resident set size of this process; None where it can't be read."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+# -------------------------------------------------------------------
+# ACCOUNTING
+# -------------------------------------------------------------------
+def account(groups: Dict[str, Iterable]) -> Dict[str, Tuple[int, int]]:
+    """{group: (images, bytes)} for named collections of images.
+
+    Every object is counted once, in the first group that holds it, so a
+    handle shared between e.g. captures and frame slots costs nothing in
+    the later group. None entries are skipped.
+    """
+    seen = set()
+    report = {}
+    for name, items in groups.items():
+        count = size = 0
+        for obj in items:
+            if obj is None or id(obj) in seen:
+                continue
+            seen.add(id(obj))
+            count += 1
+            size += image_bytes(obj)
+        report[name] = (count, size)
+    return report
@@ -0,0 +1,160 @@
+import csv
+import io
+import json
+import platform
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+
+# -------------------------------------------------------------------
+# STAGE TIMINGS
+# -------------------------------------------------------------------
+class PerfStats:
+    """Rolling per-stage timings, rates and gauges; safe to feed from any thread.
+
+    Keeps the last `window` samples of each stage. With enabled=False every
+    call returns immediately, so instrumented code costs next to nothing.
+    """
+
+    def __init__(self, window: int = 120, enabled: bool = True):
+        self.window = window
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._samples: Dict[str, deque] = {}
+        self._ticks: Dict[str, deque] = {}
+        self._gauges: Dict[str, float] = {}
+
+    def record(self, stage: str, seconds: float):
+        if not self.enabled:
+            return
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def tick(self, name: str):
+        """Count one event (e.g. a displayed frame); see rate()."""
+        if not self.enabled:
+            return
+        with self._lock:
+            ticks = self._ticks.get(name)
+            if ticks is None:
+                ticks = self._ticks[name] = deque(maxlen=self.window)
+            ticks.append(time.monotonic())
+
+    def rate(self, name: str) -> float:
+        """Events per second over the last `window` ticks."""
+        with self._lock:
+            ticks = list(self._ticks.get(name, ()))
+        if len(ticks) < 2 or ticks[-1] == ticks[0]:
+            return 0.0
+        return (len(ticks) - 1) / (ticks[-1] - ticks[0])
+
+    def gauge(self, name: str, value: float):
+        if self.enabled:
+            with self._lock:
+                self._gauges[name] = value
+
+    def snapshot(self) -> dict:
+        """{"stages": {stage: {n, mean_ms, p95_ms, max_ms}}, "gauges": {...}}"""
+        with self._lock:
+            samples = {k: sorted(v) for k, v in self._samples.items() if v}
+            gauges = dict(self._gauges)
+            ticks = list(self._ticks)
+
+        stages = {}
+        for stage, values in samples.items():
+            stages[stage] = {
+                "n": len(values),
+                "mean_ms": sum(values) / len(values) * 1000,
+                "p95_ms": values[min(len(values) - 1, int(len(values) * 0.95))] * 1000,
+                "max_ms": values[-1] * 1000,
+            }
+        for name in ticks:
+            gauges[f"{name}_fps"] = self.rate(name)
+        return {"stages": stages, "gauges": gauges}
+
+    def hud_text(self) -> str:
+        snap = self.snapshot()
+        lines = [" · ".join(f"{k} {v:.1f}" if isinstance(v, float) else f"{k} {v}"
+                            for k, v in sorted(snap["gauges"].items()))]
+        for stage, s in snap["stages"].items():
+            lines.append(f"{stage:<12}{s['mean_ms']:7.2f} ms  p95 {s['p95_ms']:7.2f}")
+        return "\n".join(lines)
+
+
+# -------------------------------------------------------------------
+# METRICS LOG
+# -------------------------------------------------------------------
+CSV_FIELDS = ["time", "host", "context", "name", "n", "mean_ms", "p95_ms", "max_ms", "value"]
+
+
+class MetricsLog:
+    """Appends PerfStats snapshots to a CSV (.csv) or JSON-lines (.jsonl) file.
+
+    The file rolls over at `max_bytes`, keeping `backups` older copies
+    (perf.csv.1, perf.csv.2, ...). Every row carries the host name and a
+    free-form context (e.g. preview mode) so logs from different laptops
+    and settings can be compared.
+    """
+
+    def __init__(self, path: Path, max_bytes: int = 1_000_000, backups: int = 3):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.host = platform.node()
+        self.as_csv = self.path.suffix.lower() == ".csv"
+
+    def _roll_over(self):
+        if not self.path.exists() or self.path.stat().st_size < self.max_bytes:
+            return
+        for i in range(self.backups - 1, 0, -1):
+            older = self.path.with_name(f"{self.path.name}.{i}")
+            if older.exists():
+                older.replace(self.path.with_name(f"{self.path.name}.{i + 1}"))
+        self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+
+    def write(self, stats: PerfStats, context: Optional[dict] = None):
+        snap = stats.snapshot()
+        if not snap["stages"] and not snap["gauges"]:
+            return
+        now = time.strftime("%Y-%m-%dT%H:%M:%S")
+        context = context or {}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._roll_over()
+        new_file = not self.path.exists()
+
+        if not self.as_csv:
+            record = {"time": now, "host": self.host, "context": context, **snap}
+            with open(self.path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+            return
+
+        ctx = ";".join(f"{k}={v}" for k, v in context.items())
+        buf = io.StringIO()
+        writer = csv.DictWriter(buf, CSV_FIELDS)
+        if new_file:
+            writer.writeheader()
+        for name, s in snap["stages"].items():
+            writer.writerow({"time": now, "host": self.host, "context": ctx, "name": name,
+                             "n": s["n"], "mean_ms": f"{s['mean_ms']:.3f}",
+                             "p95_ms": f"{s['p95_ms']:.3f}", "max_ms": f"{s['max_ms']:.3f}"})
+        for name, value in snap["gauges"].items():
+            writer.writerow({"time": now, "host": self.host, "context": ctx,
+                             "name": name, "value": round(value, 3)})
+        with open(self.path, "a", newline="") as f:
+            f.write(buf.getvalue())
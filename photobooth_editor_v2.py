@@ -1,12 +1,32 @@
-import cv2
 import tkinter as tk
 from tkinter.messagebox import showerror, askyesno
 
 import ttkbootstrap as ttk
 from PIL import Image, ImageOps, ImageTk
+import os
+import queue
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Tuple
+from typing import List, Optional, Tuple, Union
+
+from camera import BurstCapture, CameraWarmer, grab_still
+from compositor import composite_strip, render_print
+from encoders import get_encoder, write_outputs
+from frame_assets import DesignBundle, FrameDesign, FrameDesignCache
+from filters import FILTERS, FilterCache, apply_filter
+from frame_layouts import LayoutIndex
+from image_pipeline import (
+    PREVIEW_MODES,
+    ThumbnailCache,
+    crop_array_to_ratio,
+    scale_for_preview,
+)
+from memory_stats import account, current_rss_bytes
+from perf import MetricsLog, PerfStats
+from save_worker import SaveJob, SaveWorker
+from session_queue import CaptureSession, SessionQueue
+from session_scheduler import SessionScheduler
 
 # -------------------------------------------------------------------
 # CONFIG
@@ -15,11 +35,36 @@ WIDTH = 1000
 HEIGHT = 1000
 
 MAX_CAPTURED_IMAGES = 8   # how many photos you can take (fixed at 8)
-MAX_FRAME_IMAGES = 4      # how many photos go into the final frame
+MAX_FRAME_IMAGES = 4      # photos in the frame when a design has no detected windows
+
+# Session timing in seconds. Shots run on absolute deadlines, so a session
+# always takes FIRST_SHOT_DELAY + 7 * BETWEEN_SHOTS_DELAY
+FIRST_SHOT_DELAY = 3
+BETWEEN_SHOTS_DELAY = 1
 
 BASE_DIR = Path(__file__).resolve().parent
 BACKGROUND_DIR = BASE_DIR / "frame_designs"
 GOOGLE_DRIVE_FOLDER = BASE_DIR / "photos"
+CACHE_DIR = BASE_DIR / "cache"
+LAYOUT_INDEX_PATH = CACHE_DIR / "frame_layouts.json"   # detected slots per design hash
+DESIGN_BUNDLE_PATH = CACHE_DIR / "designs.bundle"      # pre-baked pixels (bake_designs.py)
+PENDING_SAVES_DIR = BASE_DIR / "pending_saves"   # unfinished saves kept across restarts
+
+MAX_PENDING_SAVES = 3     # strips waiting for the background writer
+MAX_SAVE_ATTEMPTS = 3     # then a failing save moves to pending_saves/failed
+
+# Output: "screen" renders the WIDTH x HEIGHT canvas as before; "print"
+# renders the strip at PRINT_SIZE_IN inches and PRINT_DPI, band by band.
+# With a PNG OUTPUT_ENCODER and no MASTER_ENCODER the bands are streamed
+# straight to the file; other formats need the whole print in memory
+OUTPUT_MODE = "screen"
+PRINT_SIZE_IN = (6, 4)
+PRINT_DPI = 300
+
+# File formats, by preset name in encoders.ENCODER_PRESETS ("png", "jpeg",
+# "webp", ...). Set MASTER_ENCODER (e.g. "png") to also keep a lossless master
+OUTPUT_ENCODER = "png"
+MASTER_ENCODER = None
 
 SLOT_W = 354   # width of one white box (frame slot)
 SLOT_H = 236   # height of one white box
@@ -35,31 +80,85 @@ PREVIEW_H = int(PREVIEW_W / SLOT_RATIO)
 LAYOUT_BOX_W = 110
 LAYOUT_BOX_H = int(LAYOUT_BOX_W / SLOT_RATIO)
 
+SLOT_BORDER = 2   # white border around photos on the layout canvas
+
+# Stills: "shutter" takes the frame read at the shutter moment (the sharpest
+# of a burst) off the UI thread; "preview" reuses the frame on screen (old
+# behaviour). Either way a still has the stream's resolution
+# (CAMERA_STREAM_SIZE): the camera is never switched to another mode around
+# the shutter, since a UVC mode change takes hundreds of ms, re-runs auto
+# exposure and would lose the burst frames from just before the shutter
+STILL_CAPTURE_MODE = "shutter"
+
+# Camera mode requested for the stream (None: the driver's default). The live
+# preview, stills and bursts all come from this one stream, so it is a
+# trade-off, and the only way to get sharper stills. 1920x1080 keeps the
+# preview at full frame rate and is plenty for screen strips and 6x4" prints
+# at 300 dpi. A larger request such as
+# (4096, 4096) (the driver picks its largest mode) gives sharper stills, but
+# every preview frame then pays a full-size colour conversion and flip, many
+# UVC webcams drop to 5-15 fps, and the burst history keeps BURST_FRAMES full
+# frames (~25 MB each at 4K) in memory
+CAMERA_STREAM_SIZE = (1920, 1080)
+
+# Burst ("shutter" stills only): score BURST_FRAMES frames around the shutter,
+# BURST_BEFORE of them from just before it, and keep the sharpest.
+# BURST_FRAMES = 1 takes the single next frame as before
+BURST_FRAMES = 5
+BURST_BEFORE = 2
+
+# Where frames come from (frame_sources.open_source): "device:0" (webcam),
+# "video:clip.mp4", "dir:stills/@15" or "synthetic:3840x2160@30" for testing
+# without a camera. The PHOTOBOOTH_SOURCE environment variable overrides it.
+CAMERA_SOURCE = os.environ.get("PHOTOBOOTH_SOURCE", "device:0")
+
+# The camera is opened and warmed up in the background while the landing
+# page is shown, and released after CAMERA_IDLE_TIMEOUT s without a session
+CAMERA_WARMUP_FRAMES = 15     # frames discarded while exposure settles
+CAMERA_IDLE_TIMEOUT = 120
+CAMERA_RETRY_DELAY = 10       # after a failed open, before the landing page retries
+
+# Pipelined two-station mode: the capture page gets its own window and
+# finished sessions queue up for the editor window, so the next guest can
+# shoot while the previous one picks photos. PHOTOBOOTH_PIPELINE=1 turns it
+# on. At most PIPELINE_MAX_WAITING sessions wait; each holds 8 full stills
+PIPELINE_MODE = os.environ.get("PHOTOBOOTH_PIPELINE") == "1"
+PIPELINE_MAX_WAITING = 3
+
+# Performance metrics: per-stage timings of the capture loop and saves. Off
+# unless PHOTOBOOTH_PERF=1; F3 toggles the on-screen HUD (and turns metrics
+# on). While on, PERF_LOG_PATH (.csv or .jsonl, None = off) gets a snapshot
+# every PERF_LOG_EVERY seconds
+PERF_METRICS = os.environ.get("PHOTOBOOTH_PERF") == "1"
+PERF_HUD = False
+PERF_LOG_PATH = BASE_DIR / "perf_logs" / "perf.csv"
+PERF_LOG_EVERY = 5
+MEMORY_SAMPLE_EVERY = 10   # seconds between memory reports (also one per saved session)
+
+# Photo filters (filters.FILTERS). Previews are filtered at display size and
+# cached up to FILTER_CACHE_MB; the saved strip is filtered at full resolution
+FILTER_CACHE_MB = 64
+
+# Live filter on the camera preview (Ctrl+F cycles). When its rolling cost
+# per frame exceeds LIVE_FILTER_BUDGET_MS it runs on a smaller frame (down to
+# LIVE_FILTER_MIN_SCALE of PREVIEW_W x PREVIEW_H) that is scaled back up for
+# display; the resolution is restored once the cost drops well under budget
+LIVE_FILTER = "none"
+LIVE_FILTER_BUDGET_MS = 8
+LIVE_FILTER_MIN_SCALE = 0.5
+
+# Live preview interpolation: "fast", "balanced" or "quality" (Ctrl+P cycles)
+PREVIEW_QUALITY = "balanced"
+
 
 # -------------------------------------------------------------------
 # HELPER FUNCTIONS
 # -------------------------------------------------------------------
-def resize_to_fit(image: Image.Image, target_width: int, target_height: int) -> Image.Image:
-    """Resize background to (almost) fit canvas while keeping aspect ratio,
-    and rotate 90 degrees like your original code."""
-    img_width, img_height = image.size
-    img_aspect = img_width / img_height
-    target_aspect = target_width / target_height
-
-    if img_aspect > target_aspect:
-        new_width = target_width
-        new_height = int(target_width / img_aspect)
-    else:
-        new_height = target_height
-        new_width = int(target_height * img_aspect)
-
-    resized_image = image.resize((int(new_width * 0.9), int(new_height * 0.9)))
-    resized_image = resized_image.rotate(90, expand=True)
-    return resized_image
-
-
 def create_photo_strip_positions_display() -> List[Tuple[int, int]]:
-    """Positions used when DRAWING on the layout canvas (what the user sees)."""
+    """Positions used when DRAWING on the layout canvas (what the user sees).
+
+    Fallback for designs where frame_layouts.py finds no photo windows.
+    """
     return [
         (177, 58),
         (537, 58),
@@ -68,7 +167,7 @@ def create_photo_strip_positions_display() -> List[Tuple[int, int]]:
     ]
 
 def create_photo_strip_positions_save() -> List[Tuple[int, int]]:
-    """Positions used when SAVING to the final image file."""
+    """Positions used when SAVING to the final image file (fallback, as above)."""
     return [
         (177, 256),
         (177 + 354 + 6, 256),
@@ -87,17 +186,60 @@ class PhotoboothApp:
         self.root.geometry("1100x1000")
         self.root.resizable(True, True)
 
+        # Performance metrics (fed from the capture, Tk and save threads)
+        self.perf = PerfStats(enabled=PERF_METRICS or PERF_HUD)
+        self.perf_hud_visible = PERF_HUD
+        self.perf_log = MetricsLog(PERF_LOG_PATH) if PERF_LOG_PATH else None
+        self.perf_log_due = time.monotonic() + PERF_LOG_EVERY
+        self.memory_due = 0.0
+
         # Camera
-        self.cap = None
+        self.camera = CameraWarmer(
+            CAMERA_SOURCE,
+            CAMERA_STREAM_SIZE,
+            warmup_frames=CAMERA_WARMUP_FRAMES,
+            idle_timeout=CAMERA_IDLE_TIMEOUT,
+            retry_delay=CAMERA_RETRY_DELAY,
+            perf=self.perf,
+            history=BURST_FRAMES if BURST_FRAMES > 1 else 0,
+        )
+        self.grabber = None                 # FrameGrabber (capture thread)
         self.camera_running = False
-        self.current_preview_pil = None  # cropped to SLOT_RATIO
+        self.current_preview_frame = None   # RGB array view cropped to SLOT_RATIO
         self.current_preview_tk = None
+        self.preview_mode = PREVIEW_QUALITY
+        self.last_preview_seq = 0           # seq of the frame currently shown
+        self.camera_stats_var = tk.StringVar(value="")
+        self.live_filter_var = tk.StringVar(value=LIVE_FILTER)
+        self.live_filter_scale = 1.0        # filter resolution factor (preview size stays)
+        self.live_filter_ms = 0.0           # rolling cost of the live filter
+        self.live_filter_samples = 0
 
         # Countdown / sequence
         self.is_counting_down = False       # used to lock the button
         self.sequence_running = False       # are we in the 8-photo sequence?
         self.sequence_index = 0             # which photo (0..7)
-        self.sequence_delay_remaining = 0   # seconds until next photo
+        self.scheduler = SessionScheduler(
+            self.root.after,
+            MAX_CAPTURED_IMAGES,
+            FIRST_SHOT_DELAY,
+            BETWEEN_SHOTS_DELAY,
+            on_countdown=self._show_countdown,
+            on_shot=self._capture_one_in_sequence,
+            on_done=self._sequence_done,
+        )
+        self.still_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="stills")
+        self.burst = BurstCapture(BURST_FRAMES, BURST_BEFORE, perf=self.perf)
+
+        # Sessions: the one being shot, the queue of finished ones (pipelined
+        # mode) and the one on the layout page
+        self.capture_session: Optional[CaptureSession] = None
+        self.editing_session: Optional[CaptureSession] = None
+        self.sessions = SessionQueue(PIPELINE_MAX_WAITING)
+        self.sessions.subscribe(self._on_queue_changed)
+        self.session_count = 0
+        self.queue_var = tk.StringVar(value="")
+        self.capture_window = None          # separate Toplevel in pipelined mode
 
         # Global style tweaks
         style = ttk.Style()
@@ -106,28 +248,55 @@ class PhotoboothApp:
         style.configure("Section.TLabel", font=("Segoe UI", 11, "bold"))
         style.configure("TButton", padding=(10, 6))
 
-        # Data: layout slots (final 4 photos)
+        # Data: layout slots, (x, y) or (x, y, w, h) per slot; replaced by the
+        # detected windows of the current design in _update_slot_layout()
         self.image_positions_display = create_photo_strip_positions_display()
         self.image_positions_save = create_photo_strip_positions_save()
+        self.frame_slot_count = MAX_FRAME_IMAGES
 
-        self.current_images = [None] * MAX_FRAME_IMAGES   # 4 images used in the frame
+        self.current_images = [None] * MAX_FRAME_IMAGES   # shared handles into captured_images
         self.image_widgets = [None] * MAX_FRAME_IMAGES    # keep PhotoImage refs per slot
-
-        # Data: captured pool (8 photos from the sequence)
-        self.captured_images = [None] * MAX_CAPTURED_IMAGES
-        self.captured_thumbs = [None] * MAX_CAPTURED_IMAGES
+        self.slot_items: list[dict] = []                  # persistent layout-canvas items
+        self.slot_display_cache = {}                      # (capture, version, geometry) -> PhotoImage
+
+        # Data: captured pool (8 photos from the sequence). Captures are never
+        # modified in place, so slots, thumbnails and save jobs share them
+        self.captured_images = [None] * MAX_CAPTURED_IMAGES      # slot-sized working copies
+        self.captured_originals = [None] * MAX_CAPTURED_IMAGES   # stills at stream resolution
+        self.capture_versions = [0] * MAX_CAPTURED_IMAGES   # bumped on every new capture
+        self.captured_thumbs = ThumbnailCache((LAYOUT_BOX_W - 6, LAYOUT_BOX_H - 6))
         self.layout_slot_canvases: list[tk.Canvas] = []
-        self.layout_thumbs = [None] * MAX_CAPTURED_IMAGES
+        self.layout_slot_items: list[dict] = []             # persistent canvas item ids
+        self.layout_thumbs = [None] * MAX_CAPTURED_IMAGES   # (version, PhotoImage)
         self.frame_selection_order: list[int] = []  # indices into captured_images
 
         # Backgrounds
-        self.filtered_cache = {}
+        self.frame_designs = FrameDesignCache(
+            BACKGROUND_DIR, WIDTH, HEIGHT,
+            layout_index=LayoutIndex(LAYOUT_INDEX_PATH),
+            bundle=DesignBundle(DESIGN_BUNDLE_PATH),
+        )
+        self.designs = []               # FrameDesign per background (shared with save)
+        self.filtered_cache = FilterCache(FILTER_CACHE_MB * 1_000_000)
+        self.current_filter = "none"    # applied to every photo of the strip
+        self.filter_buttons = {}        # filter name -> button in the filter bar
+        self.filter_previews = {}       # filter name -> (source key, PhotoImage)
         self.background_images = []     # large ImageTk for display
         self.background_thumbs = []     # small ImageTk for bottom bar
         self.current_background_index = 0
 
-        # Status bar
+        # Status bar (the capture window has its own in pipelined mode)
         self.status_var = tk.StringVar(value="Ready")
+        self.capture_status_var = tk.StringVar(value="Ready") if PIPELINE_MODE else self.status_var
+
+        # Background save worker (composite + encode + write off the Tk thread)
+        self.save_worker = SaveWorker(
+            self._render_save_job,
+            PENDING_SAVES_DIR,
+            max_pending=MAX_PENDING_SAVES,
+            write=self._write_strip,
+            max_attempts=MAX_SAVE_ATTEMPTS,
+        )
 
         # Pages: "landing", "capture", "layout"
         self.current_page = "landing"
@@ -138,9 +307,23 @@ class PhotoboothApp:
         self.display_background()
         self._update_buttons()
 
-        # Shortcuts
-        self.root.bind("<space>", lambda e: self.start_sequence())
+        recovered = self.save_worker.recover()
+        if recovered:
+            self.status_var.set(f"Finishing {recovered} save(s) from last session...")
+        self._poll_save_worker()
+        self._update_perf()
+        if PIPELINE_MODE:
+            self._on_queue_changed()
+            self.start_camera()   # the capture station keeps the camera
+
+        # Shortcuts (capture keys go to the capture window in pipelined mode)
+        capture_root = self.capture_window or self.root
+        capture_root.bind("<space>", lambda e: self.start_sequence())
+        capture_root.bind("<Control-p>", lambda e: self.cycle_preview_mode())
+        capture_root.bind("<Control-f>", lambda e: self.cycle_live_filter())
+        capture_root.bind("<F3>", lambda e: self.toggle_perf_hud())
         self.root.bind("<Control-s>", lambda e: self.save_canvas())
+        self.root.bind("<Motion>", self._on_activity, add="+")
 
     # ---------------------- UI LAYOUT --------------------------------
     def _build_ui(self):
@@ -158,9 +341,24 @@ class PhotoboothApp:
         self.main_frame.pack(side="top", fill="both", expand=True)
 
         self.page_landing = ttk.Frame(self.main_frame)
-        self.page_capture = ttk.Frame(self.main_frame)
         self.page_layout = ttk.Frame(self.main_frame)
 
+        if PIPELINE_MODE:
+            # Capture station: its own window, always showing the camera
+            self.capture_window = tk.Toplevel(self.root)
+            self.capture_window.title("Photobooth Capture")
+            self.capture_window.geometry("1400x1000")
+            ttk.Label(
+                self.capture_window,
+                textvariable=self.capture_status_var,
+                anchor="w",
+                bootstyle="secondary-inverse",
+            ).pack(side="bottom", fill="x")
+            self.page_capture = ttk.Frame(self.capture_window)
+            self.page_capture.pack(fill="both", expand=True)
+        else:
+            self.page_capture = ttk.Frame(self.main_frame)
+
         self._build_landing_page()
         self._build_capture_page()
         self._build_layout_page()
@@ -185,6 +383,18 @@ class PhotoboothApp:
         )
         title.pack(pady=(0, 20))
 
+        if PIPELINE_MODE:
+            # Editor station: sessions arrive from the capture window
+            subtitle = ttk.Label(
+                container,
+                text="Waiting for photos from the capture station...",
+                anchor="center",
+                justify="center",
+            )
+            subtitle.pack(pady=(0, 20))
+            ttk.Label(container, textvariable=self.queue_var, anchor="center").pack()
+            return
+
         subtitle = ttk.Label(
             container,
             text="Tap the button below to start a new photo session.",
@@ -202,12 +412,26 @@ class PhotoboothApp:
         start_btn.pack(pady=10)
 
     def show_landing_page(self):
-        self.page_capture.pack_forget()
+        if not PIPELINE_MODE:
+            self.page_capture.pack_forget()
         self.page_layout.pack_forget()
         self.page_landing.pack(fill="both", expand=True)
 
         self.current_page = "landing"
+        if PIPELINE_MODE:
+            self.status_var.set("Waiting for the next session...")
+            return
         self.status_var.set("Welcome! Click 'Start Photobooth' to begin.")
+        self.camera.warm()   # open the camera now so the session starts instantly
+
+    def _on_activity(self, event=None):
+        # Someone is at the booth: keep (or get) the camera warm
+        if self.current_page != "landing":
+            return
+        self.camera.warm()
+        if self.camera.error:
+            # Tell the staff now rather than when a guest starts a session
+            self.status_var.set(f"{self.camera.error} (retrying every {CAMERA_RETRY_DELAY} s)")
 
     def start_session(self):
         """From landing → reset, go to camera page, start camera."""
@@ -266,6 +490,39 @@ class PhotoboothApp:
         )
         self.capture_btn.pack()
 
+        filter_row = ttk.Frame(button_frame, padding=0)
+        filter_row.pack(pady=(8, 0))
+        for name, look in FILTERS.items():
+            ttk.Radiobutton(
+                filter_row,
+                text=look.label,
+                value=name,
+                variable=self.live_filter_var,
+                bootstyle="toolbutton",
+                command=self._live_filter_changed,
+            ).pack(side="left", padx=2)
+
+        camera_stats = ttk.Label(
+            button_frame,
+            textvariable=self.camera_stats_var,
+            anchor="center",
+            bootstyle="secondary",
+        )
+        camera_stats.pack(pady=(6, 0))
+
+        if PIPELINE_MODE:
+            queue_label = ttk.Label(
+                button_frame,
+                textvariable=self.queue_var,
+                anchor="center",
+                bootstyle="info",
+            )
+            queue_label.pack(pady=(6, 0))
+
+    def _capture_page_shown(self) -> bool:
+        # The capture window of pipelined mode is always up
+        return PIPELINE_MODE or self.current_page == "capture"
+
     def show_capture_page(self):
         self.page_landing.pack_forget()
         self.page_layout.pack_forget()
@@ -289,14 +546,14 @@ class PhotoboothApp:
         top_area.grid(row=0, column=0, sticky="ew", pady=(12, 6))
         top_area.columnconfigure(0, weight=1)
 
-        info_label = ttk.Label(
+        self.selector_info_label = ttk.Label(
             top_area,
-            text="Select up to 4 photos in order for the strip",
+            text=f"Select up to {MAX_FRAME_IMAGES} photos in order for the strip",
             style="Section.TLabel",
             anchor="center",
             justify="center",
         )
-        info_label.grid(row=0, column=0, pady=(0, 6))
+        self.selector_info_label.grid(row=0, column=0, pady=(0, 6))
 
         self.selector_wrapper = ttk.Frame(top_area)
         self.selector_wrapper.grid(row=1, column=0)
@@ -305,6 +562,20 @@ class PhotoboothApp:
         self.selector_bar = ttk.Frame(self.selector_wrapper)
         self.selector_bar.grid(row=0, column=0)
 
+        # Filter looks, each previewed on a thumbnail of the first photo
+        self.filter_bar = ttk.Frame(top_area, padding=0)
+        self.filter_bar.grid(row=2, column=0, pady=(6, 0))
+        for name, look in FILTERS.items():
+            btn = ttk.Button(
+                self.filter_bar,
+                text=look.label,
+                compound="top",
+                bootstyle="secondary-outline",
+                command=lambda n=name: self.set_filter(n),
+            )
+            btn.pack(side="left", padx=4)
+            self.filter_buttons[name] = btn
+
         # ---------- MIDDLE: CANVAS AREA ----------
         self.canvas_area = ttk.Frame(self.page_layout)
         self.canvas_area.grid(row=1, column=0, sticky="nsew")
@@ -341,18 +612,25 @@ class PhotoboothApp:
         )
         self.save_btn.pack()
 
+        if PIPELINE_MODE:
+            ttk.Label(save_frame, textvariable=self.queue_var, anchor="center").pack(pady=(6, 0))
+
     def show_layout_page(self):
         self.page_landing.pack_forget()
-        self.page_capture.pack_forget()
+        if not PIPELINE_MODE:
+            self.page_capture.pack_forget()
         self.page_layout.pack(fill="both", expand=True)
 
         self.current_page = "layout"
-        self.status_var.set("Layout mode: choose up to 4 photos and save your strip.")
+        self.status_var.set(
+            f"Layout mode: choose up to {self.frame_slot_count} photos and save your strip."
+        )
 
         self._populate_layout_selector()
+        self._refresh_filter_bar()
         self._highlight_selected_background()
-        self._draw_photos_on_canvas()
         self.display_background()
+        self._draw_photos_on_canvas()
         self._update_buttons()
 
     # ---------- layout selector strip ----------
@@ -361,6 +639,7 @@ class PhotoboothApp:
             child.destroy()
 
         self.layout_slot_canvases = []
+        self.layout_slot_items = []
         self.layout_thumbs = [None] * MAX_CAPTURED_IMAGES
 
         for idx in range(MAX_CAPTURED_IMAGES):
@@ -376,64 +655,133 @@ class PhotoboothApp:
             c.bind("<Button-1>", lambda e, i=idx: self.toggle_frame_selection(i))
             self.layout_slot_canvases.append(c)
 
+            # Items are created once; _refresh_layout_selector only updates them
+            items = {
+                "image": c.create_image(LAYOUT_BOX_W // 2, LAYOUT_BOX_H // 2),
+                "label": c.create_text(
+                    LAYOUT_BOX_W // 2,
+                    LAYOUT_BOX_H // 2,
+                    text=f"{idx + 1}",
+                    fill="#666",
+                ),
+                "border": c.create_rectangle(
+                    2,
+                    2,
+                    LAYOUT_BOX_W - 2,
+                    LAYOUT_BOX_H - 2,
+                    outline="#888",
+                    width=2,
+                ),
+                "badge": c.create_oval(
+                    8, 8, 26, 26,
+                    fill="dodgerblue",
+                    outline="white",
+                    width=1,
+                    state="hidden",
+                ),
+                "order": c.create_text(
+                    17, 17,
+                    text="",
+                    fill="white",
+                    font=("TkDefaultFont", 9, "bold"),
+                    state="hidden",
+                ),
+            }
+            self.layout_slot_items.append(items)
+
         self._refresh_layout_selector()
 
+    def _capture_thumb(self, idx: int) -> Image.Image:
+        """Unfiltered selector thumbnail of captured photo `idx`."""
+        version = self.capture_versions[idx]
+        thumb = self.captured_thumbs.get(idx, version)
+        if thumb is None:
+            # Not submitted (e.g. image set outside a capture): build it now
+            self.captured_thumbs.submit(idx, version, self.captured_images[idx])
+            thumb = self.captured_thumbs.get(idx, version)
+        return thumb
+
+    def _selector_thumb(self, idx: int):
+        """PhotoImage for captured photo `idx`, built once per capture version and filter."""
+        tag = (self.capture_versions[idx], self.current_filter)
+        cached = self.layout_thumbs[idx]
+        if cached is not None and cached[0] == tag:
+            return cached[1]
+
+        thumb = self._filtered((idx, tag[0]), self._capture_thumb(idx))
+        tk_thumb = ImageTk.PhotoImage(thumb)
+        self.layout_thumbs[idx] = (tag, tk_thumb)
+        return tk_thumb
+
+    # ---------- filters ----------
+    def _filtered(self, key, img: Image.Image, name: Optional[str] = None) -> Image.Image:
+        """`img` of capture `key` = (index, version) with a filter, via the LRU cache."""
+        name = name or self.current_filter
+        if name == "none":
+            return img
+        return self.filtered_cache.get(key + (name, img.size), lambda: apply_filter(img, name))
+
+    def set_filter(self, name: str):
+        if name == self.current_filter:
+            return
+        self.current_filter = name
+        self._refresh_layout_selector()
+        self._refresh_filter_bar()
+        self._draw_photos_on_canvas()
+        self.status_var.set(f"Filter: {FILTERS[name].label}")
+
+    def _refresh_filter_bar(self):
+        """Preview every filter on the first selected (or first) photo."""
+        source = next(iter(self.frame_selection_order), None)
+        if source is None:
+            source = next((i for i, img in enumerate(self.captured_images) if img is not None), None)
+        source_key = None if source is None else (source, self.capture_versions[source])
+
+        for name, btn in self.filter_buttons.items():
+            btn.configure(bootstyle="primary" if name == self.current_filter else "secondary-outline")
+            cached = self.filter_previews.get(name)
+            if cached is not None and cached[0] == source_key:
+                continue
+            if source_key is None:
+                self.filter_previews.pop(name, None)
+                btn.configure(image="")
+                continue
+            preview = self._filtered(source_key, self._capture_thumb(source), name)
+            tk_preview = ImageTk.PhotoImage(preview)
+            self.filter_previews[name] = (source_key, tk_preview)
+            btn.configure(image=tk_preview)
+
     def _refresh_layout_selector(self):
+        """Update borders, thumbnails and order badges in place."""
         for idx in range(MAX_CAPTURED_IMAGES):
             if idx >= len(self.layout_slot_canvases):
                 break
 
             canvas = self.layout_slot_canvases[idx]
+            items = self.layout_slot_items[idx]
             img = self.captured_images[idx]
-            canvas.delete("all")
 
             selected = idx in self.frame_selection_order
             border_color = "dodgerblue" if selected else "#888"
             canvas.configure(highlightbackground=border_color)
-
-            canvas.create_rectangle(
-                2,
-                2,
-                LAYOUT_BOX_W - 2,
-                LAYOUT_BOX_H - 2,
-                outline=border_color,
-                width=2,
-            )
+            canvas.itemconfigure(items["border"], outline=border_color)
 
             if img is None:
-                canvas.create_text(
-                    LAYOUT_BOX_W // 2,
-                    LAYOUT_BOX_H // 2,
-                    text=f"{idx + 1}",
-                    fill="#666",
-                )
+                canvas.itemconfigure(items["image"], image="", state="hidden")
+                canvas.itemconfigure(items["label"], state="normal")
             else:
-                thumb = img.resize(
-                    (LAYOUT_BOX_W - 6, LAYOUT_BOX_H - 6),
-                    Image.LANCZOS
-                )
-                tk_thumb = ImageTk.PhotoImage(thumb)
-                self.layout_thumbs[idx] = tk_thumb
-                canvas.create_image(
-                    LAYOUT_BOX_W // 2,
-                    LAYOUT_BOX_H // 2,
-                    image=tk_thumb,
+                canvas.itemconfigure(
+                    items["image"], image=self._selector_thumb(idx), state="normal"
                 )
+                canvas.itemconfigure(items["label"], state="hidden")
 
-                if selected:
-                    order = self.frame_selection_order.index(idx) + 1
-                    canvas.create_oval(
-                        8, 8, 26, 26,
-                        fill="dodgerblue",
-                        outline="white",
-                        width=1,
-                    )
-                    canvas.create_text(
-                        17, 17,
-                        text=str(order),
-                        fill="white",
-                        font=("TkDefaultFont", 9, "bold"),
-                    )
+            if img is not None and selected:
+                order = self.frame_selection_order.index(idx) + 1
+                canvas.itemconfigure(items["badge"], state="normal")
+                canvas.itemconfigure(items["order"], text=str(order), state="normal")
+            else:
+                canvas.itemconfigure(items["badge"], state="hidden")
+                canvas.itemconfigure(items["order"], state="hidden")
 
     def toggle_frame_selection(self, index: int):
         if not (0 <= index < MAX_CAPTURED_IMAGES):
@@ -450,8 +798,10 @@ class PhotoboothApp:
                 f"Removed captured photo #{index + 1} from frame selection"
             )
         else:
-            if len(self.frame_selection_order) >= MAX_FRAME_IMAGES:
-                self.status_var.set("You can only select up to 4 photos for the frame")
+            if len(self.frame_selection_order) >= self.frame_slot_count:
+                self.status_var.set(
+                    f"You can only select up to {self.frame_slot_count} photos for the frame"
+                )
                 return
             self.frame_selection_order.append(index)
             self.status_var.set(
@@ -461,15 +811,15 @@ class PhotoboothApp:
 
         self._apply_frame_selection_to_slots()
         self._refresh_layout_selector()
+        self._refresh_filter_bar()
         self._draw_photos_on_canvas()
         self._update_buttons()
 
     def _apply_frame_selection_to_slots(self):
-        self.current_images = [None] * MAX_FRAME_IMAGES
-        for slot_idx, cap_idx in enumerate(self.frame_selection_order[:MAX_FRAME_IMAGES]):
-            src = self.captured_images[cap_idx]
-            if src is not None:
-                self.current_images[slot_idx] = src.copy()
+        self.current_images = [None] * self.frame_slot_count
+        for slot_idx, cap_idx in enumerate(self.frame_selection_order[:self.frame_slot_count]):
+            # Same object as the capture: nothing mutates it, so no copy
+            self.current_images[slot_idx] = self.captured_images[cap_idx]
 
     # ---------------------- BACKGROUNDS -------------------------------
     def load_background_images(self):
@@ -477,24 +827,19 @@ class PhotoboothApp:
         try:
             self.background_images.clear()
             self.background_thumbs.clear()
+            start = time.perf_counter()
+            self.designs = self.frame_designs.load_all()
 
-            for i in range(1, 7):
-                path = BACKGROUND_DIR / f"{i}.png"
-                if not path.exists():
-                    continue
-
-                pil_img = Image.open(path).convert("RGBA")
-                large = resize_to_fit(pil_img, WIDTH, HEIGHT)
-                thumb = large.copy()
-                thumb.thumbnail((120, 120))
-
-                tk_large = ImageTk.PhotoImage(large)
-                tk_thumb = ImageTk.PhotoImage(thumb)
+            for design in self.designs:
+                tk_large = ImageTk.PhotoImage(design.display)
+                tk_thumb = ImageTk.PhotoImage(design.thumb)
 
                 self.background_images.append(tk_large)
                 self.background_thumbs.append(tk_thumb)
 
             self._populate_background_bar()
+            self._update_slot_layout()
+            self.perf.record("design_load", time.perf_counter() - start)
         except Exception as e:
             showerror("Error", f"Error loading background images: {e}")
             self.status_var.set("Error loading backgrounds")
@@ -523,10 +868,45 @@ class PhotoboothApp:
 
     def set_background(self, index):
         self.current_background_index = index
+        self._update_slot_layout()
         self.display_background()
         self._highlight_selected_background()
+        self._apply_frame_selection_to_slots()
+        self._refresh_layout_selector()
+        self._draw_photos_on_canvas()
+        self._update_buttons()
         self.status_var.set(f"Background set to #{index + 1}")
 
+    def _current_design(self) -> Optional[FrameDesign]:
+        if 0 <= self.current_background_index < len(self.designs):
+            return self.designs[self.current_background_index]
+        return None
+
+    def _update_slot_layout(self):
+        """Use the detected photo windows of the current design as the slots."""
+        design = self._current_design()
+        rects = design.slot_rects() if design is not None else []
+
+        if rects:
+            bg_w, bg_h = design.size
+            # Display: centered horizontally, top-aligned (see display_background)
+            disp_x = (WIDTH - bg_w) // 2
+            # Save: centered on the WIDTH x HEIGHT canvas (see composite_strip)
+            save_x = (WIDTH - bg_w) // 2
+            save_y = (HEIGHT - bg_h) // 2
+
+            self.image_positions_display = [(disp_x + x, y, w, h) for x, y, w, h in rects]
+            self.image_positions_save = [(save_x + x, save_y + y, w, h) for x, y, w, h in rects]
+        else:
+            self.image_positions_display = create_photo_strip_positions_display()
+            self.image_positions_save = create_photo_strip_positions_save()
+
+        self.frame_slot_count = len(self.image_positions_save)
+        del self.frame_selection_order[self.frame_slot_count:]
+        self.selector_info_label.configure(
+            text=f"Select up to {self.frame_slot_count} photos in order for the strip"
+        )
+
     def display_background(self):
         if not self.background_images or not hasattr(self, "canvas"):
             return
@@ -550,57 +930,129 @@ class PhotoboothApp:
 
 
     # ---------------------- CAMERA -----------------------------------
-    def _crop_to_slot_ratio(self, img: Image.Image) -> Image.Image:
-        """Center-crop the given image to the SLOT_W:SLOT_H aspect ratio."""
-        w, h = img.size
-        current_ratio = w / h
-
-        if current_ratio > SLOT_RATIO:
-            new_w = int(h * SLOT_RATIO)
-            left = (w - new_w) // 2
-            box = (left, 0, left + new_w, h)
+    def cycle_preview_mode(self):
+        modes = list(PREVIEW_MODES)
+        idx = modes.index(self.preview_mode) if self.preview_mode in modes else -1
+        self.preview_mode = modes[(idx + 1) % len(modes)]
+        self.capture_status_var.set(f"Preview quality: {self.preview_mode}")
+
+    def cycle_live_filter(self):
+        names = list(FILTERS)
+        current = self.live_filter_var.get()
+        idx = names.index(current) if current in names else -1
+        self.live_filter_var.set(names[(idx + 1) % len(names)])
+        self._live_filter_changed()
+
+    def _live_filter_changed(self):
+        # Every filter gets a fresh chance at full preview resolution
+        self.live_filter_scale = 1.0
+        self.live_filter_ms = 0.0
+        self.live_filter_samples = 0
+        self.capture_status_var.set(f"Live filter: {FILTERS[self.live_filter_var.get()].label}")
+
+    def _track_live_filter(self, name: str, seconds: float):
+        """Record the live filter's cost and adapt the resolution it runs at."""
+        self.perf.record(f"filter_{name}", seconds)
+        ms = seconds * 1000
+        self.live_filter_samples += 1
+        if self.live_filter_samples == 1:
+            self.live_filter_ms = ms
         else:
-            new_h = int(w / SLOT_RATIO)
-            top = (h - new_h) // 2
-            box = (0, top, w, top + new_h)
+            self.live_filter_ms += (ms - self.live_filter_ms) * 0.1
 
-        return img.crop(box)
+        # Judge only after a few frames so one slow first call doesn't count
+        if self.live_filter_samples < 15:
+            return
+        if (self.live_filter_ms > LIVE_FILTER_BUDGET_MS
+                and self.live_filter_scale > LIVE_FILTER_MIN_SCALE):
+            scale = max(LIVE_FILTER_MIN_SCALE, self.live_filter_scale * 0.75)
+        elif self.live_filter_ms < LIVE_FILTER_BUDGET_MS * 0.5 and self.live_filter_scale < 1.0:
+            # Cost grows with area: stepping up ~doubles it, so only with room to spare
+            scale = min(1.0, self.live_filter_scale / 0.75)
+        else:
+            return
+        self.live_filter_scale = scale
+        self.live_filter_samples = 0
+        self.capture_status_var.set(
+            f"{FILTERS[name].label} filter at {scale:.0%} resolution "
+            f"({self.live_filter_ms:.1f} ms/frame before)"
+        )
 
     def start_camera(self):
+        """Switch to the pre-warmed stream (or wait for it without blocking Tk)."""
         if self.camera_running:
             return
+        self.camera.warm(retry=True)   # a guest is waiting: don't sit out the retry delay
+        self._wait_for_camera()
 
-        self.cap = cv2.VideoCapture(0)
-        if not self.cap.isOpened():
-            showerror("Error", "Could not open camera. Check permissions.")
-            self.status_var.set("Could not open camera")
+    def _wait_for_camera(self):
+        if self.camera_running or not self._capture_page_shown():
+            return
+        if self.camera.error:
+            showerror("Error", self.camera.error)
+            self.capture_status_var.set("Could not open camera")
             return
 
+        self.camera.warm()   # reopens if the idle timeout closed it meanwhile
+        grabber = self.camera.acquire()
+        if grabber is None:
+            self.capture_status_var.set("Starting camera...")
+            self.root.after(50, self._wait_for_camera)
+            return
+
+        self.grabber = grabber
+        self.last_preview_seq = 0
+
         self.camera_running = True
-        self.status_var.set("Camera started")
+        self.capture_status_var.set("Camera started")
         self._update_buttons()
         self.update_camera_frame()
+        self._update_camera_stats()
 
     def update_camera_frame(self):
-        if not self.camera_running or self.cap is None:
+        """Pull the newest frame from the capture thread and draw it.
+
+        Runs on the Tk thread at display rate; never waits on the camera.
+        """
+        if not self.camera_running or self.grabber is None:
             return
 
-        ret, frame = self.cap.read()
-        if not ret:
+        if self.grabber.failed:
             self.camera_running = False
-            self.status_var.set("Camera stopped (no frame)")
+            self.capture_status_var.set("Camera stopped (no frame)")
             self._update_buttons()
             return
 
-        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        frame = cv2.flip(frame, 1)
-        img = Image.fromarray(frame)
-
-        cropped = self._crop_to_slot_ratio(img)
-        self.current_preview_pil = cropped
-
-        preview = cropped.resize((PREVIEW_W, PREVIEW_H), Image.LANCZOS)
-        self.current_preview_tk = ImageTk.PhotoImage(preview)
+        frame = self.grabber.latest()
+        if frame is None or frame.seq == self.last_preview_seq:
+            self.root.after(15, self.update_camera_frame)
+            return
+        self.last_preview_seq = frame.seq
+        perf = self.perf
+        t0 = time.perf_counter()
+
+        # Crop with a slice first, then a cheap cv2 scale; PIL only at the end
+        cropped = crop_array_to_ratio(frame.image, SLOT_RATIO)
+        self.current_preview_frame = cropped
+        t1 = time.perf_counter()
+
+        live_filter = self.live_filter_var.get()
+        size = (PREVIEW_W, PREVIEW_H)
+        reduced = live_filter != "none" and self.live_filter_scale < 1.0
+        if reduced:
+            size = (int(PREVIEW_W * self.live_filter_scale), int(PREVIEW_H * self.live_filter_scale))
+        preview = scale_for_preview(cropped, size, self.preview_mode)
+        t2 = tf = time.perf_counter()
+        if live_filter != "none":
+            # Precomputed matrix/LUT on the preview-sized array, before PIL
+            preview = FILTERS[live_filter].apply_array(preview)
+            if reduced:
+                # Guests still see a full-size preview, just a softer one
+                preview = scale_for_preview(preview, (PREVIEW_W, PREVIEW_H), self.preview_mode)
+            tf = time.perf_counter()
+            self._track_live_filter(live_filter, tf - t2)
+        self.current_preview_tk = ImageTk.PhotoImage(Image.fromarray(preview))
+        t3 = time.perf_counter()
 
         # Center the preview in the canvas
         canvas_w = max(self.camera_preview_main.winfo_width(), PREVIEW_W)
@@ -618,16 +1070,134 @@ class PhotoboothApp:
         self.camera_preview_main.image = self.current_preview_tk
 
         self.camera_preview_main.tag_raise("countdown")
+        self.camera_preview_main.tag_raise("hud")
+
+        perf.record("crop", t1 - t0)
+        perf.record("resize", t2 - t1)
+        perf.record("PhotoImage", t3 - tf)
+        perf.record("canvas", time.perf_counter() - t3)
+        perf.record("latency", time.monotonic() - frame.timestamp)   # read -> on screen
+        perf.tick("display")
         self.root.after(30, self.update_camera_frame)
 
+    def _update_camera_stats(self):
+        """Show real capture FPS and dropped frames under the capture button."""
+        if not self.camera_running or self.grabber is None:
+            self.camera_stats_var.set("")
+            return
+
+        self.camera_stats_var.set(self.grabber.stats_text())
+        self.root.after(1000, self._update_camera_stats)
+
+    # ---------------------- PERFORMANCE HUD ---------------------------
+    def toggle_perf_hud(self):
+        self.perf_hud_visible = not self.perf_hud_visible
+        if self.perf_hud_visible:
+            self.perf.enabled = True
+        self._draw_perf_hud()
+
+    def _draw_perf_hud(self):
+        canvas = self.camera_preview_main
+        canvas.delete("hud")
+        if not self.perf_hud_visible:
+            return
+
+        text = canvas.create_text(
+            16, 16, anchor="nw", text=self.perf.hud_text(),
+            fill="#39ff14", font=("Courier", 12), tags="hud",
+        )
+        x0, y0, x1, y1 = canvas.bbox(text)
+        canvas.create_rectangle(x0 - 8, y0 - 6, x1 + 8, y1 + 6,
+                                fill="black", outline="", tags="hud")
+        canvas.tag_raise(text)
+
+    def _update_perf(self):
+        """Refresh gauges and the HUD twice a second; append to the log when due."""
+        if self.grabber is not None:
+            self.perf.gauge("camera_fps", self.grabber.capture_fps())
+            self.perf.gauge("dropped", self.grabber.dropped_frames)
+        # Is the camera warm, and how long did the last open + warm-up take?
+        self.perf.gauge("camera_open", 1.0 if self.camera.is_open else 0.0)
+        if self.camera.open_seconds:
+            self.perf.gauge("camera_open_s", self.camera.open_seconds)
+        self.perf.gauge("saves_pending", self.save_worker.pending_count())
+        self.perf.gauge("sessions_waiting", len(self.sessions))
+        if self.live_filter_var.get() != "none":
+            self.perf.gauge("preview_scale", self.live_filter_scale)
+        if self.perf.enabled and time.monotonic() >= self.memory_due:
+            # Walks every held image, so not on each 500 ms tick
+            self._sample_memory()
+        self._draw_perf_hud()
+
+        if self.perf_log is not None and time.monotonic() >= self.perf_log_due:
+            self.perf_log_due = time.monotonic() + PERF_LOG_EVERY
+            self._write_perf_log()
+        self.root.after(500, self._update_perf)
+
+    def _sample_memory(self):
+        self.memory_due = time.monotonic() + MEMORY_SAMPLE_EVERY
+        for name, (_, size) in self.memory_report().items():
+            self.perf.gauge(f"mem_{name}_mb", size / 1e6)
+        rss = current_rss_bytes()
+        if rss is not None:
+            self.perf.gauge("rss_mb", rss / 1e6)
+
+    def _write_perf_log(self):
+        if self.perf_log is None or not self.perf.enabled:
+            return
+        context = {"preview": self.preview_mode, "output": OUTPUT_MODE,
+                   "encoder": OUTPUT_ENCODER, "page": self.current_page}
+        try:
+            self.perf_log.write(self.perf, context)
+        except OSError as e:
+            print(f"Could not write perf log: {e}")
+            self.perf_log = None
+
+    # ---------------------- MEMORY ------------------------------------
+    def memory_report(self):
+        """{group: (images, bytes)} of the pixels the app holds right now.
+
+        Each image counts once, in the first group holding it: frame slots
+        share the capture objects, so "slots" stays at zero.
+        """
+        sessions = list(self.sessions)
+        if self.capture_session is not None:
+            sessions.append(self.capture_session)
+        waiting = [img for s in sessions
+                   for img in s.images + s.originals + s.finished_thumbs()]
+
+        photo_images = [self.current_preview_tk, *self.image_widgets,
+                        *self.slot_display_cache.values()]
+        photo_images += [entry[1] for entry in self.layout_thumbs if entry is not None]
+        photo_images += [entry[1] for entry in self.filter_previews.values()]
+
+        designs = [img for d in self.designs for img in d.images()]
+        designs += self.background_images + self.background_thumbs
+
+        return account({
+            "captures": self.captured_images + self.captured_originals,
+            "slots": self.current_images,
+            "queued": waiting,
+            "thumbnails": self.captured_thumbs.images(),
+            "photoimages": photo_images,
+            "filters": self.filtered_cache.values(),
+            "designs": designs,
+        })
+
     # ---------------------- 8-PHOTO SEQUENCE --------------------------
     def start_sequence(self):
-        """Start the 8-photo timed sequence: 15s before first, 10s between others."""
-        if self.current_page != "capture":
+        """Start the 8-photo timed sequence (FIRST_SHOT_DELAY, then BETWEEN_SHOTS_DELAY)."""
+        if not self._capture_page_shown():
             return
 
         if self.sequence_running:
-            self.status_var.set("Session already running...")
+            self.capture_status_var.set("Session already running...")
+            return
+
+        if PIPELINE_MODE and self.sessions.full():
+            self.capture_status_var.set(
+                f"{len(self.sessions)} sessions are waiting to be edited, please wait..."
+            )
             return
 
         if not self.camera_running:
@@ -635,44 +1205,45 @@ class PhotoboothApp:
             if not self.camera_running:
                 return
 
-        # Reset captured images for this new sequence
-        self.captured_images = [None] * MAX_CAPTURED_IMAGES
-        self.frame_selection_order.clear()
-        self.current_images = [None] * MAX_FRAME_IMAGES
+        # Photos of this sequence go into a new session; the layout page keeps
+        # its own until this one is handed over
+        self.session_count += 1
+        self.capture_session = CaptureSession(self.session_count, MAX_CAPTURED_IMAGES)
+        self.capture_session.filter = self.live_filter_var.get()
 
         self.sequence_running = True
         self.sequence_index = 0
-        self.sequence_delay_remaining = 3  # first wait: 15 seconds
         self.is_counting_down = True
 
-        self.status_var.set("Starting 8-photo session... first photo in 15 seconds.")
+        self.capture_status_var.set(
+            f"Starting 8-photo session... first photo in {FIRST_SHOT_DELAY} seconds."
+        )
         self._update_buttons()
-        self._sequence_countdown_tick()
+        self.scheduler.start()
 
-    def _sequence_countdown_tick(self):
-        if not self.sequence_running:
-            # Clean up any leftover countdown graphics
-            self.camera_preview_main.delete("countdown")
-            self.is_counting_down = False
-            self._update_buttons()
-            return
+    def _stop_sequence(self):
+        self.scheduler.cancel()
+        self.camera_preview_main.delete("countdown")
+        self.sequence_running = False
+        self.is_counting_down = False
+        self._update_buttons()
 
+    def _show_countdown(self, shot: int, seconds: int):
+        """Scheduler callback: draw the countdown badge for the next photo."""
         # Remove previous countdown drawing
         self.camera_preview_main.delete("countdown")
 
-        # If we're done counting, take the photo
-        if self.sequence_delay_remaining <= 0:
-            self.camera_preview_main.delete("countdown")
-            self._capture_one_in_sequence()
-            return
+        # Update status bar text
+        self.capture_status_var.set(
+            f"Photo {shot + 1} of {MAX_CAPTURED_IMAGES} in {seconds} seconds..."
+        )
 
         # --- Get canvas size safely ---
         canvas_w = self.camera_preview_main.winfo_width()
         canvas_h = self.camera_preview_main.winfo_height()
 
-        # If canvas hasn't been laid out yet, try again shortly
+        # Canvas not laid out yet: skip the badge, the schedule keeps running
         if canvas_w < 50 or canvas_h < 50:
-            self.root.after(100, self._sequence_countdown_tick)
             return
 
         # Small countdown badge in the top-right corner
@@ -701,7 +1272,7 @@ class PhotoboothApp:
         self.camera_preview_main.create_text(
             cx,
             cy,
-            text=str(self.sequence_delay_remaining),
+            text=str(seconds),
             fill="white",
             font=("Segoe UI", font_size, "bold"),
             tags="countdown",
@@ -709,40 +1280,44 @@ class PhotoboothApp:
 
         # Make sure countdown is above the video preview
         self.camera_preview_main.tag_raise("countdown")
+        self.camera_preview_main.tag_raise("hud")
 
-        # Update status bar text
-        self.status_var.set(
-            f"Photo {self.sequence_index + 1} of {MAX_CAPTURED_IMAGES} in "
-            f"{self.sequence_delay_remaining} seconds..."
-        )
-
-        # Schedule next tick
-        self.sequence_delay_remaining -= 1
-        self.root.after(1000, self._sequence_countdown_tick)
-
+    def _capture_one_in_sequence(self, shot: int, deadline: float):
+        """Scheduler callback: take photo `shot`, which was due at `deadline`."""
+        self.camera_preview_main.delete("countdown")
+        self.perf.record("shot_jitter", time.monotonic() - deadline)
 
-    def _capture_one_in_sequence(self):
-        if self.current_preview_pil is None:
+        if self.current_preview_frame is None or self.grabber is None:
+            self._stop_sequence()
             showerror("Error", "No camera frame available to capture.")
-            self.status_var.set("No camera frame to capture")
-            self.sequence_running = False
-            self.is_counting_down = False
-            self._update_buttons()
+            self.capture_status_var.set("No camera frame to capture")
             return
 
-        if self.sequence_index >= MAX_CAPTURED_IMAGES:
-            self.sequence_running = False
-            self.is_counting_down = False
-            self._update_buttons()
-            return
-
-        img = self.current_preview_pil.copy().convert("RGB")
-        cropped = img.resize((SLOT_W, SLOT_H), Image.LANCZOS)
-        slot_idx = self.sequence_index
-        self.captured_images[slot_idx] = cropped
-        self.sequence_index += 1
+        slot_idx = shot
+        session = self.capture_session
+        self.sequence_index = shot + 1
+        # The frame from the scheduled moment, even if this callback ran late
+        shutter_seq = self.grabber.seq_at(deadline)
+
+        if STILL_CAPTURE_MODE == "shutter":
+            # Fresh stream-resolution frame (sharpest of a burst) + LANCZOS
+            # downscale on a worker thread
+            session.pending += 1
+            future = self.still_executor.submit(
+                self.burst.capture if BURST_FRAMES > 1 else grab_still,
+                self.grabber,
+                shutter_seq,
+                SLOT_RATIO,
+                (SLOT_W, SLOT_H),
+            )
+            self._collect_still(session, slot_idx, future)
+        else:
+            # Full-quality resampling only for frames that are actually kept
+            original = Image.fromarray(self.current_preview_frame)
+            working = original.resize((SLOT_W, SLOT_H), Image.LANCZOS)
+            session.store(slot_idx, original, working, self.captured_thumbs.build(working))
 
-        self.status_var.set(f"Captured photo {slot_idx + 1} of {MAX_CAPTURED_IMAGES}")
+        self.capture_status_var.set(f"Captured photo {slot_idx + 1} of {MAX_CAPTURED_IMAGES}")
         self._flash_preview()
 
         try:
@@ -750,17 +1325,86 @@ class PhotoboothApp:
         except Exception:
             pass
 
-        if self.sequence_index >= MAX_CAPTURED_IMAGES:
-            self.sequence_running = False
-            self.is_counting_down = False
-            self.status_var.set("All 8 photos captured! Building layout...")
-            self._update_buttons()
+    def _sequence_done(self):
+        """Scheduler callback after the last photo."""
+        if self.scheduler.jitter:
+            late_ms = [j * 1000 for j in self.scheduler.jitter]
+            self.perf.gauge("shot_late_mean_ms", sum(late_ms) / len(late_ms))
+            self.perf.gauge("shot_late_max_ms", max(late_ms))
+        self.sequence_running = False
+        self.is_counting_down = False
+        self.capture_status_var.set("All 8 photos captured! Building layout...")
+        self._update_buttons()
+        self._hand_off_when_stills_ready(self.capture_session)
+        self.capture_session = None
+
+    def _collect_still(self, session: CaptureSession, slot_idx: int, future: Future):
+        """Poll a grab_still() job without blocking the Tk thread."""
+        if not future.done():
+            self.root.after(10, lambda: self._collect_still(session, slot_idx, future))
+            return
+
+        session.pending -= 1
+        try:
+            original, working = future.result()
+        except Exception as e:
+            self.capture_status_var.set(f"Could not capture photo {slot_idx + 1}: {e}")
+            return
+        # Thumbnail built now, while the guest is still shooting
+        session.store(slot_idx, original, working, self.captured_thumbs.build(working))
+
+    def _hand_off_when_stills_ready(self, session: CaptureSession):
+        """Once all stills are in, queue the session (pipelined) or edit it now."""
+        if not session.ready:
+            self.root.after(20, lambda: self._hand_off_when_stills_ready(session))
+            return
+
+        if not PIPELINE_MODE:
+            self._load_session(session)
             self.show_layout_page()
+            return
+
+        self.sessions.put(session)
+        self.capture_status_var.set(
+            f"Session {session.number} sent to the editor. Next guest, press the button!"
+        )
+        if self.editing_session is None:
+            self._edit_next_session()
+
+    def _edit_next_session(self):
+        """Editor station: take the oldest waiting session, or wait for one."""
+        session = self.sessions.pop()
+        if session is None:
+            self.show_landing_page()
+            return
+        self._load_session(session)
+        self.show_layout_page()
+
+    def _load_session(self, session: CaptureSession):
+        """Put a finished session's photos on the layout page."""
+        self._reset_images()
+        self.editing_session = session
+        self.current_filter = session.filter   # the look the guest saw while shooting
+        self.captured_images = session.images
+        self.captured_originals = session.originals
+        for idx, thumb in enumerate(session.thumbs):
+            self.capture_versions[idx] += 1
+            if thumb is not None:
+                # Started when the photo landed; usually finished by now
+                self.captured_thumbs.adopt(idx, self.capture_versions[idx], thumb)
+
+    def _on_queue_changed(self):
+        """Show the number of waiting sessions on both stations."""
+        if not PIPELINE_MODE:
+            return
+        waiting = len(self.sessions)
+        if waiting:
+            self.queue_var.set(
+                f"Sessions waiting to edit: {waiting} (max {self.sessions.max_waiting})"
+            )
         else:
-            self.sequence_delay_remaining = 1  # 10 seconds between remaining photos
-            self.is_counting_down = True
-            self._update_buttons()
-            self._sequence_countdown_tick()
+            self.queue_var.set("No sessions waiting to edit")
+        self._update_buttons()
 
     def _flash_preview(self):
         if not hasattr(self, "camera_preview_main"):
@@ -797,100 +1441,168 @@ class PhotoboothApp:
 
     def _reset_images(self):
         self.captured_images = [None] * MAX_CAPTURED_IMAGES
-        self.captured_thumbs = [None] * MAX_CAPTURED_IMAGES
-        self.current_images = [None] * MAX_FRAME_IMAGES
+        self.captured_originals = [None] * MAX_CAPTURED_IMAGES
+        self.captured_thumbs.clear()
+        self.layout_thumbs = [None] * MAX_CAPTURED_IMAGES
+        self.current_images = [None] * self.frame_slot_count
         self.filtered_cache.clear()
+        self.current_filter = "none"
         self.frame_selection_order.clear()
-        self.image_widgets = [None] * MAX_FRAME_IMAGES
+        self.image_widgets = [None] * self.frame_slot_count
+
+        self.slot_display_cache.clear()
 
         if hasattr(self, "canvas"):
             self.canvas.delete("photo")
             self.canvas.delete("delete_btn")
             self.canvas.delete("selection")
+            self.slot_items = []
 
         if self.current_page == "layout":
             self._populate_layout_selector()
+            self._refresh_filter_bar()
             self._draw_photos_on_canvas()
 
         self._update_buttons()
 
     def _reset_after_save(self):
         """Clear everything and return to landing page after saving."""
+        if self.perf.enabled and self.editing_session is not None:
+            # One memory sample per session, taken while it is still held
+            self._sample_memory()
+            self._write_perf_log()
         self._reset_images()
+        self.editing_session = None
+        if PIPELINE_MODE:
+            # The camera belongs to the capture station; move on to the next guest
+            self._edit_next_session()
+            return
         self.shutdown()
         self.show_landing_page()
 
     # ---------------------- DRAW PHOTOS ON CANVAS --------------------
-    def _draw_photos_on_canvas(self):
-        if not hasattr(self, "canvas"):
-            return
-
-        BORDER = 2
-        self.canvas.delete("photo")
-        self.canvas.delete("delete_btn")
-        self.canvas.delete("selection")
-        self.image_widgets = [None] * MAX_FRAME_IMAGES
-
-        for idx in range(MAX_FRAME_IMAGES):
-            img = self.current_images[idx]
-            base_x, base_y = self.image_positions_display[idx]
-            x = base_x - 2
-            y = base_y
-
-            # self.canvas.create_rectangle(
-            #     x,
-            #     y,
-            #     x + SLOT_W,
-            #     y + SLOT_H,
-            #     outline="#dddddd" if img is None else "",
-            #     width=1,
-            #     tags=("photo", f"photo_{idx}"),
-            # )
-
-            if img is not None:
-                bordered = ImageOps.expand(img, border=BORDER, fill="white")
-                tk_img = ImageTk.PhotoImage(bordered)
-                self.image_widgets[idx] = tk_img
-
-                self.canvas.create_image(
-                    x,
-                    y,
-                    anchor="nw",
-                    image=tk_img,
-                    tags=("photo", f"photo_{idx}")
-                )
-
-                x_btn = x + SLOT_W + BORDER - 10
-                y_btn = y + 10
-                btn_radius = 12
-
-                self.canvas.create_oval(
-                    x_btn - btn_radius,
-                    y_btn - btn_radius,
-                    x_btn + btn_radius,
-                    y_btn + btn_radius,
+    def _slot_content_key(self, idx: int):
+        """(captured index, capture version, filter) shown in frame slot `idx`, or None."""
+        if self.current_images[idx] is None or idx >= len(self.frame_selection_order):
+            return None
+        cap_idx = self.frame_selection_order[idx]
+        return cap_idx, self.capture_versions[cap_idx], self.current_filter
+
+    def _slot_geometry(self, idx: int):
+        """(x, y, w, h, fitted) of frame slot `idx` on the layout canvas."""
+        position = self.image_positions_display[idx]
+        if len(position) == 4:
+            # Detected window: fill it exactly
+            x, y, w, h = position
+            return x, y, w, h, True
+        return position[0] - 2, position[1], SLOT_W + SLOT_BORDER, SLOT_H + SLOT_BORDER, False
+
+    def _slot_display_image(self, idx: int, key, geometry):
+        """Bordered/fitted PhotoImage for a slot, built once per capture + geometry."""
+        _, _, w, h, fitted = geometry
+        cache_key = key + (w, h, fitted)
+        tk_img = self.slot_display_cache.get(cache_key)
+        if tk_img is None:
+            # Filtered at working size; the full-resolution pass happens at save
+            img = self._filtered(key[:2], self.current_images[idx], key[2])
+            if fitted:
+                shown = ImageOps.fit(img, (w, h), Image.BILINEAR)
+            else:
+                shown = ImageOps.expand(img, border=SLOT_BORDER, fill="white")
+            tk_img = ImageTk.PhotoImage(shown)
+            self.slot_display_cache[cache_key] = tk_img
+        return tk_img
+
+    def _ensure_slot_items(self):
+        """Create (hidden) canvas items for each frame slot, or drop extra ones."""
+        while len(self.slot_items) > self.frame_slot_count:
+            items = self.slot_items.pop()
+            self.canvas.delete(items["image"], items["btn"], items["btn_text"])
+
+        while len(self.slot_items) < self.frame_slot_count:
+            idx = len(self.slot_items)
+            items = {
+                "image": self.canvas.create_image(
+                    0, 0, anchor="nw", state="hidden", tags=("photo", f"photo_{idx}")
+                ),
+                "btn": self.canvas.create_oval(
+                    0, 0, 0, 0,
                     fill="#f44336",
                     outline="white",
-                    tags=("delete_btn", f"delete_{idx}")
-                )
-                self.canvas.create_text(
-                    x_btn,
-                    y_btn,
+                    state="hidden",
+                    tags=("delete_btn", f"delete_{idx}"),
+                ),
+                "btn_text": self.canvas.create_text(
+                    0, 0,
                     text="✕",
                     fill="white",
                     font=("TkDefaultFont", 10, "bold"),
-                    tags=("delete_btn", f"delete_{idx}")
-                )
-                self.canvas.tag_bind(
-                    f"delete_{idx}",
-                    "<Button-1>",
-                    lambda e, i=idx: self._delete_frame_slot(i)
-                )
-                
-        self.canvas.tag_lower("photo", "background")
+                    state="hidden",
+                    tags=("delete_btn", f"delete_{idx}"),
+                ),
+                "drawn": None,   # (content key, geometry) currently on screen
+            }
+            self.canvas.tag_bind(
+                f"delete_{idx}",
+                "<Button-1>",
+                lambda e, i=idx: self._delete_frame_slot(i)
+            )
+            self.slot_items.append(items)
+
+    def _draw_photos_on_canvas(self):
+        """Update only the frame slots whose photo or geometry changed."""
+        if not hasattr(self, "canvas"):
+            return
+
+        self._ensure_slot_items()
+        if len(self.image_widgets) != self.frame_slot_count:
+            self.image_widgets = [None] * self.frame_slot_count
+
+        for idx, items in enumerate(self.slot_items):
+            key = self._slot_content_key(idx)
+            geometry = self._slot_geometry(idx)
+            if items["drawn"] == (key, geometry):
+                continue
+            items["drawn"] = (key, geometry)
+
+            if key is None:
+                self.image_widgets[idx] = None
+                for item in (items["image"], items["btn"], items["btn_text"]):
+                    self.canvas.itemconfigure(item, state="hidden")
+                continue
+
+            tk_img = self._slot_display_image(idx, key, geometry)
+            self.image_widgets[idx] = tk_img
+
+            x, y, slot_w, _, _ = geometry
+            self.canvas.coords(items["image"], x, y)
+            self.canvas.itemconfigure(items["image"], image=tk_img, state="normal")
+
+            x_btn = x + slot_w - 10
+            y_btn = y + 10
+            btn_radius = 12
+            self.canvas.coords(
+                items["btn"],
+                x_btn - btn_radius,
+                y_btn - btn_radius,
+                x_btn + btn_radius,
+                y_btn + btn_radius,
+            )
+            self.canvas.coords(items["btn_text"], x_btn, y_btn)
+            self.canvas.itemconfigure(items["btn"], state="normal")
+            self.canvas.itemconfigure(items["btn_text"], state="normal")
+
+        # Stacking is cheap and display_background() may have re-added the frame
+        design = self._current_design()
+        if design is not None and design.photos_on_top:
+            # Opaque white windows: photos must sit above the frame
+            self.canvas.tag_raise("photo")
+            self.canvas.tag_raise("delete_btn")
+        elif self.canvas.find_withtag("background"):
+            self.canvas.tag_lower("photo", "background")
 
     def _delete_frame_slot(self, index: int):
-        if 0 <= index < MAX_FRAME_IMAGES:
+        if 0 <= index < self.frame_slot_count:
             if index < len(self.frame_selection_order):
                 cap_idx = self.frame_selection_order[index]
                 if cap_idx in self.frame_selection_order:
@@ -908,93 +1620,128 @@ class PhotoboothApp:
             self.status_var.set("Save canceled")
             return
 
-        try:
-            GOOGLE_DRIVE_FOLDER.mkdir(parents=True, exist_ok=True)
-
-            fname = f"photo_strip_{time.strftime('%Y%m%d_%H%M%S')}.png"
-            file_path = GOOGLE_DRIVE_FOLDER / fname
-
-            canvas_image = Image.new("RGBA", (WIDTH, HEIGHT), (255, 255, 255, 255))
-
-            crop_region = (0, 0, WIDTH, HEIGHT)
-            bg_resized = None
-            x_offset = y_offset = 0
-
-            if self.background_images:
-                idx = self.current_background_index + 1
-                bg_path = BACKGROUND_DIR / f"{idx}.png"
-
-                if bg_path.exists():
-                    bg_pillow = Image.open(bg_path).convert("RGBA")
-                    bg_resized = resize_to_fit(bg_pillow, WIDTH, HEIGHT)
-                    bg_width, bg_height = bg_resized.size
-                    x_offset = (WIDTH - bg_width) // 2
-                    y_offset = (HEIGHT - bg_height) // 2
-
-                    # Crop to the frame bounds
-                    crop_region = (
-                        x_offset,
-                        y_offset,
-                        x_offset + bg_width,
-                        y_offset + bg_height,
-                    )
-
-            # --- 1) Paste PHOTOS first (behind the frame) ---
-            # Use save positions if you defined them; otherwise fall back.
-            positions = getattr(self, "image_positions_save", None)
-            if positions is None:
-                # fallback: use whatever positions you're using for display
-                positions = getattr(self, "image_positions_display", None)
-            if positions is None:
-                positions = getattr(self, "image_positions", [])
-
-            for idx, img in enumerate(self.current_images):
-                if img is None:
-                    continue
-                if idx >= len(positions):
-                    break
-
-                img_x, img_y = positions[idx]
-
-                # Keep aspect / size like before
-                aspect = img.width / img.height
-                new_height = SLOT_H
-                new_width = int(new_height * aspect)
-
-                # Convert to RGBA so alpha compositing works if needed
-                resized = img.resize((new_width, new_height), Image.LANCZOS).convert("RGBA")
-                # Optional white border
-                resized = ImageOps.expand(resized, border=2, fill="white")
-
-                # Paste photo onto base canvas (no mask needed; it's opaque)
-                canvas_image.paste(resized, (img_x, img_y), resized)
-
-            # --- 2) Paste FRAME / BACKGROUND on TOP using alpha mask ---
-            if bg_resized is not None:
-                # Paste with its own alpha as mask -> frame on top, photos visible through holes
-                canvas_image.paste(bg_resized, (x_offset, y_offset), bg_resized)
-
-            # Crop to the frame area
-            cropped = canvas_image.crop(crop_region)
-
-            # PNG supports RGBA, so we can save directly
-            cropped.save(file_path)
-
-            self.status_var.set(f"Image saved to {file_path}. Ready for new photos.")
-            print(f"Image saved to {file_path}")
-
-            self._reset_after_save()
+        fname = f"photo_strip_{time.strftime('%Y%m%d_%H%M%S')}.png"
+        file_path = GOOGLE_DRIVE_FOLDER / fname
+
+        design_path = None
+        if 0 <= self.current_background_index < len(self.designs):
+            design_path = self.designs[self.current_background_index].path
+
+        # Use save positions if you defined them; otherwise fall back.
+        positions = getattr(self, "image_positions_save", None)
+        if positions is None:
+            # fallback: use whatever positions you're using for display
+            positions = getattr(self, "image_positions_display", None)
+        if positions is None:
+            positions = getattr(self, "image_positions", [])
+
+        # Save from the full-resolution originals; none of these images are
+        # mutated in place, so the job can share them with the UI
+        photos = []
+        for slot_idx, img in enumerate(self.current_images):
+            original = None
+            if img is not None and slot_idx < len(self.frame_selection_order):
+                original = self.captured_originals[self.frame_selection_order[slot_idx]]
+            photos.append(original if original is not None else img)
+
+        with self.perf.measure("save_submit"):
+            job = SaveJob(file_path, photos, design_path, positions, self.current_filter)
+            submitted = self.save_worker.submit(job)
+        if not submitted:
+            self.status_var.set("Still saving previous strips, try again in a moment")
+            return
 
-        except Exception as e:
-            showerror("Error", f"Error saving image: {e}")
-            self.status_var.set("Error saving image")
+        self._reset_after_save()
+        self.status_var.set(
+            f"Saving strip ({self.save_worker.pending_count()} in progress). "
+            "Ready for new photos."
+        )
+
+    def _render_save_job(self, job: SaveJob) -> Union[Image.Image, List[Path]]:
+        """Composite a strip for the save worker. Runs off the Tk thread.
+
+        Print-mode PNGs are written band by band here and come back as the
+        written path; everything else returns the image for _write_strip.
+        """
+        share = get_encoder(OUTPUT_ENCODER)
+        stream_to = None
+        if OUTPUT_MODE == "print" and share.format == "PNG" and not MASTER_ENCODER:
+            stream_to = job.file_path.with_suffix(share.extension)
+        with self.perf.measure("save_render"):
+            image = self._composite_job(job, stream_to, share.options.get("compress_level", 6))
+        return [stream_to] if image is None else image
+
+    def _composite_job(self, job: SaveJob, output_path: Optional[Path] = None,
+                       compress_level: int = 6) -> Optional[Image.Image]:
+        """The finished strip, or None once a print was streamed to `output_path`."""
+        photos = job.photos
+        if job.filter != "none":
+            # Full-resolution filter pass, only here on the save worker
+            with self.perf.measure("save_filter"):
+                photos = [None if p is None else apply_filter(p, job.filter) for p in photos]
+
+        design = None
+        if job.design_path is not None:
+            # Already decoded + rotated by the FrameDesignCache
+            design = self.frame_designs.get(job.design_path)
+
+        if OUTPUT_MODE == "print" and design is not None:
+            return render_print(
+                photos, design, self._print_slots(design), PRINT_SIZE_IN, PRINT_DPI,
+                output_path, compress_level,
+            )
+
+        return composite_strip(photos, design, job.positions, (WIDTH, HEIGHT), SLOT_H)
+
+    def _write_strip(self, image: Image.Image, path: Path) -> List[Path]:
+        """Encode a finished strip with the configured encoders (save worker)."""
+        master = get_encoder(MASTER_ENCODER) if MASTER_ENCODER else None
+        with self.perf.measure("save_encode"):
+            return write_outputs(image, path, get_encoder(OUTPUT_ENCODER), master)
+
+    def _print_slots(self, design: FrameDesign):
+        """Slots as design fractions; converts the fixed layout if none were detected."""
+        if design.slots:
+            return design.slots
+
+        bg_w, bg_h = design.size
+        save_x = (WIDTH - bg_w) // 2
+        save_y = (HEIGHT - bg_h) // 2
+        slot_w = SLOT_W + 2 * SLOT_BORDER
+        slot_h = SLOT_H + 2 * SLOT_BORDER
+        return [
+            ((x - save_x) / bg_w, (y - save_y) / bg_h, slot_w / bg_w, slot_h / bg_h)
+            for x, y in create_photo_strip_positions_save()
+        ]
+
+    def _poll_save_worker(self):
+        """Report finished/failed background saves in the status bar."""
+        while True:
+            try:
+                job, error = self.save_worker.results.get_nowait()
+            except queue.Empty:
+                break
+
+            pending = self.save_worker.pending_count()
+            suffix = f" ({pending} still saving)" if pending else ""
+            if error is None:
+                saved = job.written[0] if job.written else job.file_path
+                print(f"Image saved to {saved}")
+                self.status_var.set(f"Image saved to {saved}{suffix}")
+            else:
+                print(f"Error saving {job.file_path}: {error}")
+                if job.attempts >= self.save_worker.max_attempts:
+                    suffix = f" (gave up after {job.attempts} attempts){suffix}"
+                self.status_var.set(f"Error saving image: {error}{suffix}")
 
+        self.root.after(200, self._poll_save_worker)
 
     # ---------------------- BUTTON STATE ------------------------------
     def _update_buttons(self):
         # capture page button
-        if self.current_page == "capture":
-            if self.is_counting_down or self.sequence_running or not self.camera_running:
+        if self._capture_page_shown() and hasattr(self, "capture_btn"):
+            busy = self.is_counting_down or self.sequence_running or not self.camera_running
+            if busy or (PIPELINE_MODE and self.sessions.full()):
                 self.capture_btn.configure(state="disabled")
             else:
                 self.capture_btn.configure(state="normal")
@@ -1006,10 +1753,10 @@ class PhotoboothApp:
 
     # ---------------------- CLEANUP ----------------------------------
     def shutdown(self):
+        """End the session's use of the camera; it stays warm until idle."""
         self.camera_running = False
-        if self.cap is not None:
-            self.cap.release()
-            self.cap = None
+        self.grabber = None   # its fps and drops are in the camera_fps/dropped gauges
+        self.camera.release()
 
 
 # -------------------------------------------------------------------
@@ -1021,7 +1768,16 @@ if __name__ == "__main__":
 
     def on_close():
         app.shutdown()
+        app.camera.close()
+        app._write_perf_log()
+        app.status_var.set("Finishing saves...")
+        root.update_idletasks()
+        persisted = app.save_worker.close()
+        if persisted:
+            print(f"{persisted} unfinished save(s) kept in {PENDING_SAVES_DIR}")
         root.destroy()
 
     root.protocol("WM_DELETE_WINDOW", on_close)
+    if app.capture_window is not None:
+        app.capture_window.protocol("WM_DELETE_WINDOW", on_close)
     root.mainloop()
@@ -0,0 +1,256 @@
+import itertools
+import json
+import queue
+import shutil
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Tuple, Union
+
+from PIL import Image
+
+from encoders import atomic_write
+
+
+# -------------------------------------------------------------------
+# SAVE JOB
+# -------------------------------------------------------------------
+class SaveJob:
+    """Everything needed to render and write one strip, detached from the UI."""
+
+    def __init__(self, file_path: Path, photos: List[Optional[Image.Image]],
+                 design_path: Optional[Path], positions: List[Tuple[int, int]],
+                 filter: str = "none", attempts: int = 0):
+        self.file_path = Path(file_path)
+        self.photos = list(photos)
+        self.design_path = Path(design_path) if design_path is not None else None
+        self.positions = [tuple(p) for p in positions]
+        self.filter = filter                        # filters.FILTERS name, applied at render
+        self.attempts = attempts                    # failed renders/writes so far
+        self.persisted_dir: Optional[Path] = None   # set when loaded from disk
+        self.written: List[Path] = []               # files produced by the worker
+
+    def persist(self, directory: Path) -> Path:
+        """Write the job inputs to `directory` so it survives an app restart."""
+        directory.mkdir(parents=True, exist_ok=True)
+        photo_files = []
+        for i, img in enumerate(self.photos):
+            if img is None:
+                photo_files.append(None)
+                continue
+            name = f"photo_{i}.png"
+            img.save(directory / name)
+            photo_files.append(name)
+
+        self.write_manifest(directory, photo_files)
+        return directory
+
+    def write_manifest(self, directory: Path, photo_files: Optional[List[Optional[str]]] = None):
+        """(Re)write job.json, e.g. to record another failed attempt."""
+        if photo_files is None:
+            photo_files = json.loads((directory / "job.json").read_text())["photos"]
+        manifest = {
+            "file_path": str(self.file_path),
+            "design_path": str(self.design_path) if self.design_path else None,
+            "positions": self.positions,
+            "filter": self.filter,
+            "attempts": self.attempts,
+            "photos": photo_files,
+        }
+        (directory / "job.json").write_text(json.dumps(manifest, indent=2))
+
+    @classmethod
+    def load(cls, directory: Path) -> "SaveJob":
+        manifest = json.loads((directory / "job.json").read_text())
+        photos = []
+        for name in manifest["photos"]:
+            if name is None:
+                photos.append(None)
+                continue
+            with Image.open(directory / name) as img:
+                img.load()   # decoded pixels outlive the file handle; no copy
+            photos.append(img)
+
+        job = cls(
+            manifest["file_path"],
+            photos,
+            manifest["design_path"],
+            manifest["positions"],
+            manifest.get("filter", "none"),   # jobs saved before filters existed
+            manifest.get("attempts", 0),
+        )
+        job.persisted_dir = directory
+        return job
+
+
+# -------------------------------------------------------------------
+# BACKGROUND WORKER
+# -------------------------------------------------------------------
+def _save_image(image: Image.Image, path: Path) -> List[Path]:
+    save_kwargs = {"dpi": image.info["dpi"]} if "dpi" in image.info else {}
+    image_format = Image.registered_extensions()[Path(path).suffix.lower()]
+    with atomic_write(path) as tmp:
+        image.save(tmp, image_format, **save_kwargs)
+    return [path]
+
+
+class SaveWorker:
+    """Renders and writes strips on one background thread, in submit order.
+
+    `render(job)` returns the finished image, which `write(image, path)` stores
+    (default: Pillow save to job.file_path) and returns the files written.
+    A render that streams its output to disk itself returns those files
+    instead, and `write` is skipped.
+    Results arrive on `self.results` as (job, error) tuples
+    so the Tk thread can poll them with root.after().
+
+    A failed job is persisted and retried at the next start; after
+    `max_attempts` failures it is moved to `pending_dir`/failed instead,
+    so a corrupt input can't be re-run at every start forever.
+    """
+
+    FAILED_DIR = "failed"
+
+    def __init__(self, render: Callable[[SaveJob], Union[Image.Image, List[Path]]],
+                 pending_dir: Path, max_pending: int = 3,
+                 write: Optional[Callable[[Image.Image, Path], Iterable[Path]]] = None,
+                 max_attempts: int = 3):
+        self.render = render
+        self.write = write or _save_image
+        self.pending_dir = Path(pending_dir)
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.results: "queue.Queue[Tuple[SaveJob, Optional[Exception]]]" = queue.Queue()
+
+        self._jobs: deque = deque()
+        self._cond = threading.Condition()
+        self._closing = False
+        self._abandon = False
+        self._persist_seq = itertools.count(1)   # next() is safe from any thread
+        self._thread = threading.Thread(target=self._run, name="SaveWorker", daemon=True)
+        self._thread.start()
+
+    # ---------------------- submit ------------------------------------
+    def submit(self, job: SaveJob, force: bool = False) -> bool:
+        """Queue a job. Returns False if the queue is full or closing."""
+        with self._cond:
+            if self._closing:
+                return False
+            if not force and len(self._jobs) >= self.max_pending:
+                return False
+            self._jobs.append(job)
+            self._cond.notify()
+            return True
+
+    def pending_count(self) -> int:
+        with self._cond:
+            return len(self._jobs)
+
+    def recover(self) -> int:
+        """Re-queue jobs persisted by a previous close(); returns how many."""
+        if not self.pending_dir.exists():
+            return 0
+
+        count = 0
+        job_dirs = (p for p in self.pending_dir.iterdir()
+                    if p.is_dir() and p.name != self.FAILED_DIR)
+        for job_dir in sorted(job_dirs):
+            try:
+                job = SaveJob.load(job_dir)
+            except Exception as e:
+                print(f"Skipping unreadable pending save {job_dir}: {e}")
+                continue
+            self.submit(job, force=True)
+            count += 1
+        return count
+
+    # ---------------------- worker loop -------------------------------
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._jobs and not self._closing:
+                    self._cond.wait()
+                if not self._jobs or self._abandon:
+                    return
+                job = self._jobs[0]   # stays queued until written
+
+            error = None
+            try:
+                job.file_path.parent.mkdir(parents=True, exist_ok=True)
+                image = self.render(job)
+                if isinstance(image, Image.Image):
+                    job.written = list(self.write(image, job.file_path))
+                else:
+                    job.written = list(image)   # already written by the render
+                if job.persisted_dir is not None:
+                    shutil.rmtree(job.persisted_dir, ignore_errors=True)
+            except Exception as e:
+                error = e
+                self._failed(job)
+
+            with self._cond:
+                if self._jobs and self._jobs[0] is job:
+                    self._jobs.popleft()
+            self.results.put((job, error))
+
+    def _persist(self, job: SaveJob, directory: Optional[Path] = None):
+        name = f"{job.file_path.stem}_{next(self._persist_seq):03d}"
+        try:
+            job.persisted_dir = job.persist((directory or self.pending_dir) / name)
+        except Exception as e:
+            print(f"Could not persist save job {job.file_path}: {e}")
+
+    def _failed(self, job: SaveJob):
+        """Count a failure; keep the job for the next start or quarantine it."""
+        job.attempts += 1
+        if job.attempts < self.max_attempts:
+            if job.persisted_dir is None:
+                self._persist(job)
+            else:
+                try:
+                    job.write_manifest(job.persisted_dir)
+                except Exception as e:
+                    print(f"Could not update pending save {job.persisted_dir}: {e}")
+            return
+
+        failed_dir = self.pending_dir / self.FAILED_DIR
+        if job.persisted_dir is None:
+            self._persist(job, failed_dir)
+            if job.persisted_dir is None:
+                return
+        else:
+            try:
+                failed_dir.mkdir(parents=True, exist_ok=True)
+                job.write_manifest(job.persisted_dir)
+                job.persisted_dir = Path(shutil.move(str(job.persisted_dir),
+                                                     str(failed_dir / job.persisted_dir.name)))
+            except Exception as e:
+                print(f"Could not quarantine pending save {job.persisted_dir}: {e}")
+                return
+        print(f"Gave up on {job.file_path} after {job.attempts} attempts; "
+              f"inputs kept in {job.persisted_dir}")
+
+    # ---------------------- shutdown ----------------------------------
+    def close(self, timeout: float = 10.0) -> int:
+        """Drain the queue for up to `timeout` seconds, then persist the rest.
+
+        Returns the number of jobs persisted for the next start.
+        """
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+        if not self._thread.is_alive():
+            return 0
+
+        with self._cond:
+            self._abandon = True
+            leftovers = list(self._jobs)
+
+        persisted = 0
+        for job in leftovers:
+            if job.persisted_dir is None:
+                self._persist(job)
+            persisted += job.persisted_dir is not None
+        return persisted
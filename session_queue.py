@@ -0,0 +1,87 @@
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Deque, Iterator, List, Optional
+
+from PIL import Image
+
+
+# -------------------------------------------------------------------
+# CAPTURE SESSION
+# -------------------------------------------------------------------
+class CaptureSession:
+    """The photos of one guest's sequence, handed from capture to editing.
+
+    `images` are the slot-sized working copies, `originals` the
+    full-resolution stills, `thumbs` the selector thumbnails started as each
+    photo landed; `pending` counts stills still being grabbed.
+    """
+
+    def __init__(self, number: int, count: int):
+        self.number = number
+        self.images: List[Optional[Image.Image]] = [None] * count
+        self.originals: List[Optional[Image.Image]] = [None] * count
+        self.thumbs: List[Optional[Future]] = [None] * count
+        self.pending = 0
+        self.filter = "none"      # live filter chosen at capture; the editor starts with it
+        self.captured_at = time.time()
+
+    def store(self, idx: int, original: Image.Image, working: Image.Image,
+              thumb: Optional[Future] = None):
+        self.originals[idx] = original
+        self.images[idx] = working
+        self.thumbs[idx] = thumb
+
+    def finished_thumbs(self) -> List[Image.Image]:
+        """Thumbnails built so far (for memory accounting)."""
+        return [f.result() for f in self.thumbs
+                if f is not None and f.done() and f.exception() is None]
+
+    @property
+    def ready(self) -> bool:
+        return self.pending == 0
+
+
+# -------------------------------------------------------------------
+# SESSION QUEUE
+# -------------------------------------------------------------------
+class SessionQueue:
+    """Finished sessions waiting for the editing station, oldest first.
+
+    Used from the Tk thread only. Listeners run after every put/pop so both
+    windows can show the queue depth. `max_waiting` bounds memory: every
+    session holds a full set of full-resolution stills.
+    """
+
+    def __init__(self, max_waiting: int = 3):
+        self.max_waiting = max_waiting
+        self._sessions: Deque[CaptureSession] = deque()
+        self._listeners: List[Callable[[], None]] = []
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __iter__(self) -> Iterator[CaptureSession]:
+        return iter(list(self._sessions))
+
+    def full(self) -> bool:
+        return len(self._sessions) >= self.max_waiting
+
+    def subscribe(self, listener: Callable[[], None]):
+        self._listeners.append(listener)
+
+    def put(self, session: CaptureSession):
+        # A session already being shot is always accepted; full() stops new ones
+        self._sessions.append(session)
+        self._changed()
+
+    def pop(self) -> Optional[CaptureSession]:
+        if not self._sessions:
+            return None
+        session = self._sessions.popleft()
+        self._changed()
+        return session
+
+    def _changed(self):
+        for listener in self._listeners:
+            listener()
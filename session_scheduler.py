@@ -0,0 +1,91 @@
+import math
+import time
+from typing import Callable, List, Optional
+
+
+# -------------------------------------------------------------------
+# SESSION SCHEDULER
+# -------------------------------------------------------------------
+class SessionScheduler:
+    """Countdown and shots for one session, against absolute deadlines.
+
+    Shot i is due at start + first_delay + i * between_delay on the
+    monotonic clock. Every wake-up is computed from those deadlines, so a
+    slow frame or a busy Tk loop makes one callback late but never shifts
+    the rest of the session. `after(ms, fn)` is root.after.
+
+    Callbacks:
+        on_countdown(shot, seconds_left)  once per displayed second
+        on_shot(shot, deadline)           when a shot is due
+        on_done()                         after the last shot
+    """
+
+    def __init__(self, after: Callable[[int, Callable], object], shots: int,
+                 first_delay: float, between_delay: float,
+                 on_countdown: Callable[[int, int], None],
+                 on_shot: Callable[[int, float], None],
+                 on_done: Callable[[], None],
+                 clock: Callable[[], float] = time.monotonic):
+        self.after = after
+        self.shots = shots
+        self.first_delay = first_delay
+        self.between_delay = between_delay
+        self.on_countdown = on_countdown
+        self.on_shot = on_shot
+        self.on_done = on_done
+        self.clock = clock
+
+        self.start_time = 0.0
+        self.next_shot = 0
+        self.jitter: List[float] = []   # seconds each shot fired after its deadline
+        self._shown: Optional[int] = None
+        self._token = 0                 # invalidates callbacks after cancel()
+        self.running = False
+
+    def deadline(self, shot: int) -> float:
+        return self.start_time + self.first_delay + shot * self.between_delay
+
+    def start(self):
+        self._token += 1
+        self.start_time = self.clock()
+        self.next_shot = 0
+        self.jitter.clear()
+        self._shown = None
+        self.running = True
+        self._tick(self._token)
+
+    def cancel(self):
+        self._token += 1
+        self.running = False
+
+    def _tick(self, token: int):
+        if token != self._token or not self.running:
+            return
+
+        now = self.clock()
+        shot = self.next_shot
+        deadline = self.deadline(shot)
+        remaining = deadline - now
+        if remaining <= 0.0005:   # after() works in whole milliseconds
+            self.jitter.append(now - deadline)
+            self.next_shot += 1
+            self._shown = None
+            self.on_shot(shot, deadline)
+            if token != self._token:
+                return   # on_shot cancelled the session
+            if self.next_shot >= self.shots:
+                self.running = False
+                self.on_done()
+                return
+            self._tick(token)
+            return
+
+        seconds = math.ceil(remaining - 1e-6)
+        if seconds != self._shown:
+            self._shown = seconds
+            self.on_countdown(shot, seconds)
+
+        # Wake exactly when the displayed second changes (or the shot is due)
+        wake = deadline - (seconds - 1)
+        delay_ms = max(1, math.ceil((wake - self.clock()) * 1000))
+        self.after(delay_ms, lambda: self._tick(token))
@@ -1,7 +1,19 @@
+import argparse
+
 import cv2
 
+from frame_sources import open_source
+
+parser = argparse.ArgumentParser(description="Live view of a frame source")
+parser.add_argument(
+    "--source",
+    default="device:0",  # Replace 0 with the correct device index if needed
+    help='"device:0", "video:clip.mp4", "dir:stills/@15" or "synthetic:1920x1080@30"',
+)
+args = parser.parse_args()
+
 # Open the camera (usually index 0 for the first connected device)
-cap = cv2.VideoCapture(0)  # Replace 0 with the correct device index if needed
+cap = open_source(args.source)
 
 if not cap.isOpened():
     print("Unable to access the camera. Check your connection.")
@@ -0,0 +1,503 @@
+import hashlib
+import os
+import random
+import shutil
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from pathlib import Path
+from typing import Dict, List, Optional
+
+CHUNK_SIZE = 1024 * 1024   # bytes per resumable upload chunk
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# -------------------------------------------------------------------
+# BACKENDS
+# -------------------------------------------------------------------
+class Uploader:
+    """Sends one file somewhere. Raise on failure; the engine retries.
+
+    `digest` is the file's sha256; backends use it to name partial uploads
+    so a retry resumes where the last attempt stopped.
+    """
+
+    name = "base"
+
+    def upload(self, path: Path, digest: str):
+        raise NotImplementedError
+
+
+class LocalDirectoryUploader(Uploader):
+    """Copies files into a directory (stand-in for a synced shared drive)."""
+
+    name = "dir"
+
+    def __init__(self, dest: Path, chunk_size: int = CHUNK_SIZE):
+        self.dest = Path(dest)
+        self.dest.mkdir(parents=True, exist_ok=True)
+        self.chunk_size = chunk_size
+
+    def upload(self, path: Path, digest: str):
+        tmp = self.dest / f".{path.name}.{digest[:16]}.part"
+        offset = tmp.stat().st_size if tmp.exists() else 0
+        with open(path, "rb") as src, open(tmp, "ab") as dst:
+            src.seek(offset)
+            shutil.copyfileobj(src, dst, self.chunk_size)
+        os.replace(tmp, self.dest / path.name)
+
+
+class HttpUploader(Uploader):
+    """PUTs the file to `url`/<filename> in resumable chunks (see serve_http_sink).
+
+    Each chunk carries `Upload-Id: <sha256>` and a Content-Range. Before
+    sending a large file, a HEAD asks the server how many bytes of that
+    upload it already holds, so a dropped connection only costs one chunk.
+    A server that answers a chunk without `Upload-Offset` does not resume
+    uploads, so the file is sent again as one plain PUT.
+    """
+
+    name = "http"
+
+    def __init__(self, url: str, timeout: float = 30.0, chunk_size: int = CHUNK_SIZE):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+
+    def _request(self, path: Path, digest: str, method: str,
+                 data: Optional[bytes] = None, headers: Optional[dict] = None):
+        request = urllib.request.Request(
+            f"{self.url}/{urllib.parse.quote(path.name)}",
+            data=data,
+            method=method,
+            headers={"Upload-Id": digest, "Content-Type": "application/octet-stream",
+                     **(headers or {})},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                if response.status >= 300:
+                    raise OSError(f"HTTP {response.status} for {path.name}")
+                offset = response.headers.get("Upload-Offset")
+        except urllib.error.HTTPError as e:
+            if e.code != 409:
+                raise
+            # Offset mismatch: the server says where to resume
+            offset = e.headers.get("Upload-Offset")
+            if offset is None:
+                raise OSError(f"HTTP 409 without Upload-Offset for {path.name}") from e
+        # Plain HTTP servers (or proxies stripping the header) don't report one
+        return int(offset) if offset is not None else None
+
+    def _put_whole(self, path: Path, digest: str):
+        with open(path, "rb") as f:
+            self._request(path, digest, "PUT", f.read())
+
+    def upload(self, path: Path, digest: str):
+        total = path.stat().st_size
+        if total == 0:
+            # No byte range to describe: one empty PUT
+            self._request(path, digest, "PUT", b"")
+            return
+
+        offset = 0
+        if total > self.chunk_size:
+            offset = self._request(path, digest, "HEAD") or 0
+
+        with open(path, "rb") as f:
+            f.seek(offset)
+            while True:
+                chunk = f.read(self.chunk_size)
+                end = offset + len(chunk) - 1
+                acked = self._request(
+                    path, digest, "PUT", chunk,
+                    {"Content-Range": f"bytes {offset}-{end}/{total}"},
+                )
+                if acked is None:
+                    # Resumable uploads unsupported: such a server may keep
+                    # just this chunk as the file, so send it all in one go
+                    if offset > 0 or end + 1 < total:
+                        self._put_whole(path, digest)
+                    return
+                if acked <= offset:
+                    # Never re-send the same range forever; the queue retries with backoff
+                    raise OSError(f"Upload of {path.name} stuck at byte {offset} (server said {acked})")
+                offset = acked
+                if offset >= total:
+                    return
+                f.seek(offset)
+
+
+# -------------------------------------------------------------------
+# DURABLE QUEUE (SQLite)
+# -------------------------------------------------------------------
+PENDING, IN_PROGRESS, DONE, FAILED = "pending", "in_progress", "done", "failed"
+
+
+class UploadQueue:
+    """Upload jobs in SQLite, so nothing is lost if the watcher is restarted.
+
+    Finished jobs are deleted rather than kept as DONE rows, so the table
+    stays small on a kiosk that runs for months; the UploadLedger is the
+    record of what was uploaded.
+    """
+
+    def __init__(self, db_path: Path, max_attempts: int = 8,
+                 base_delay: float = 2.0, max_delay: float = 300.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(db_path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                path TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt REAL NOT NULL,
+                last_error TEXT,
+                created REAL NOT NULL,
+                updated REAL NOT NULL
+            )"""
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_due ON jobs (status, next_attempt)")
+
+        # Restart recovery: anything in flight when we died goes back to pending
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ? WHERE status = ?", (PENDING, IN_PROGRESS)
+            )
+            # DONE rows left by older versions
+            self._db.execute("DELETE FROM jobs WHERE status = ?", (DONE,))
+
+    def enqueue(self, path: Path) -> bool:
+        """Add a job unless one for this path is already waiting."""
+        now = time.time()
+        with self._lock:
+            exists = self._db.execute(
+                "SELECT 1 FROM jobs WHERE path = ? AND status IN (?, ?)",
+                (str(path), PENDING, IN_PROGRESS),
+            ).fetchone()
+            if exists:
+                return False
+            self._db.execute(
+                "INSERT INTO jobs (path, status, next_attempt, created, updated) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (str(path), PENDING, now, now, now),
+            )
+            return True
+
+    def claim(self) -> Optional[tuple]:
+        """Mark the oldest due job in progress and return (id, path, attempts)."""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, path, attempts FROM jobs WHERE status = ? AND next_attempt <= ? "
+                "ORDER BY next_attempt, id LIMIT 1",
+                (PENDING, now),
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE jobs SET status = ?, updated = ? WHERE id = ?", (IN_PROGRESS, now, row[0])
+            )
+            return row
+
+    def complete(self, job_id: int):
+        with self._lock:
+            self._db.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+    def fail(self, job_id: int, attempts: int, error: str) -> bool:
+        """Record a failure. Returns True if the job will be retried."""
+        attempts += 1
+        now = time.time()
+        retry = attempts < self.max_attempts
+        # Exponential backoff with jitter, capped at max_delay
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+        delay *= random.uniform(0.8, 1.2)
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, attempts = ?, next_attempt = ?, last_error = ?, "
+                "updated = ? WHERE id = ?",
+                (PENDING if retry else FAILED, attempts, now + delay, error, now, job_id),
+            )
+        return retry
+
+    def next_due(self) -> Optional[float]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT MIN(next_attempt) FROM jobs WHERE status = ?", (PENDING,)
+            ).fetchone()
+        return row[0]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = {PENDING: 0, IN_PROGRESS: 0, DONE: 0, FAILED: 0}
+        counts.update(dict(rows))
+        return counts
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+# -------------------------------------------------------------------
+# UPLOAD LEDGER (content hashes)
+# -------------------------------------------------------------------
+class UploadLedger:
+    """Which file contents have been uploaded, keyed by sha256.
+
+    A stat cache (path -> size, mtime, hash) means unchanged files are never
+    re-read, so scanning a folder of thousands of strips only hashes the
+    files that are new or changed since the last run.
+    """
+
+    def __init__(self, db_path: Path):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(db_path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS file_hashes (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                sha256 TEXT NOT NULL
+            )"""
+        )
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS uploaded (
+                sha256 TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                uploaded REAL NOT NULL
+            )"""
+        )
+        self.hashed = 0   # files actually read since start
+
+    def digest(self, path: Path) -> str:
+        """sha256 of `path`, from the stat cache when size and mtime match."""
+        st = os.stat(path)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT size, mtime_ns, sha256 FROM file_hashes WHERE path = ?", (str(path),)
+            ).fetchone()
+        if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+            return row[2]
+
+        digest = file_sha256(path)
+        with self._lock:
+            self.hashed += 1
+            self._db.execute(
+                "INSERT OR REPLACE INTO file_hashes (path, size, mtime_ns, sha256) "
+                "VALUES (?, ?, ?, ?)",
+                (str(path), st.st_size, st.st_mtime_ns, digest),
+            )
+        return digest
+
+    def is_uploaded(self, digest: str) -> bool:
+        with self._lock:
+            return self._db.execute(
+                "SELECT 1 FROM uploaded WHERE sha256 = ?", (digest,)
+            ).fetchone() is not None
+
+    def record(self, digest: str, path: Path):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR IGNORE INTO uploaded (sha256, path, size, uploaded) VALUES (?, ?, ?, ?)",
+                (digest, str(path), os.path.getsize(path), time.time()),
+            )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+# -------------------------------------------------------------------
+# WORKER POOL
+# -------------------------------------------------------------------
+class UploadEngine:
+    """Runs queued uploads on `workers` threads and keeps throughput counters."""
+
+    def __init__(self, queue: UploadQueue, uploader: Uploader, workers: int = 3,
+                 ledger: Optional[UploadLedger] = None):
+        self.queue = queue
+        self.uploader = uploader
+        self.ledger = ledger
+        self.workers = workers
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._counter_lock = threading.Lock()
+        self._started = time.monotonic()
+
+        self.uploaded = 0
+        self.uploaded_bytes = 0
+        self.skipped = 0
+        self.retries = 0
+        self.failed = 0
+
+    def start(self):
+        self._started = time.monotonic()
+        for i in range(self.workers):
+            t = threading.Thread(target=self._run, name=f"upload-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads.clear()
+
+    def submit(self, path: Path):
+        """Called from the watchdog thread: just records the job and returns."""
+        if self.queue.enqueue(Path(path)):
+            self._wake.set()
+
+    def scan(self, folder: Path, extensions) -> int:
+        """Queue files in `folder` whose content was never uploaded.
+
+        Unchanged files are answered from the ledger's stat cache, so only
+        new or modified files are read. Returns how many were queued.
+        """
+        queued = 0
+        for entry in os.scandir(folder):
+            if not entry.is_file() or not entry.name.lower().endswith(extensions):
+                continue
+            if self.ledger is not None and self.ledger.is_uploaded(self.ledger.digest(entry.path)):
+                continue
+            self.submit(entry.path)
+            queued += 1
+        return queued
+
+    def _run(self):
+        while not self._stop.is_set():
+            job = self.queue.claim()
+            if job is None:
+                due = self.queue.next_due()
+                wait = 1.0 if due is None else max(0.05, min(1.0, due - time.time()))
+                self._wake.wait(wait)
+                self._wake.clear()
+                continue
+
+            job_id, path, attempts = job
+            path = Path(path)
+            try:
+                digest = self.ledger.digest(path) if self.ledger else file_sha256(path)
+                if self.ledger is not None and self.ledger.is_uploaded(digest):
+                    # Same content already sent (re-save or restart): nothing to do
+                    self.queue.complete(job_id)
+                    with self._counter_lock:
+                        self.skipped += 1
+                    continue
+                self.uploader.upload(path, digest)
+                if self.ledger is not None:
+                    self.ledger.record(digest, path)
+            except Exception as e:
+                will_retry = self.queue.fail(job_id, attempts, f"{type(e).__name__}: {e}")
+                with self._counter_lock:
+                    if will_retry:
+                        self.retries += 1
+                    else:
+                        self.failed += 1
+                print(f"Upload failed for {path} ({'retrying' if will_retry else 'giving up'}): {e}")
+                continue
+
+            self.queue.complete(job_id)
+            size = path.stat().st_size if path.exists() else 0
+            with self._counter_lock:
+                self.uploaded += 1
+                self.uploaded_bytes += size
+
+    def stats(self) -> Dict[str, float]:
+        elapsed = max(time.monotonic() - self._started, 1e-6)
+        counts = self.queue.counts()
+        with self._counter_lock:
+            return {
+                "uploaded": self.uploaded,
+                "skipped": self.skipped,
+                "retries": self.retries,
+                "failed": self.failed,
+                "backlog": counts[PENDING] + counts[IN_PROGRESS],
+                "files_per_min": self.uploaded * 60 / elapsed,
+                "kb_per_s": self.uploaded_bytes / 1024 / elapsed,
+            }
+
+    def stats_text(self) -> str:
+        s = self.stats()
+        return (
+            f"uploaded {s['uploaded']} · skipped {s['skipped']} · backlog {s['backlog']} · retries {s['retries']} · "
+            f"failed {s['failed']} · {s['files_per_min']:.1f} files/min · {s['kb_per_s']:.0f} KB/s"
+        )
+
+
+# -------------------------------------------------------------------
+# LOCAL HTTP SINK (stand-in server for testing HttpUploader)
+# -------------------------------------------------------------------
+def serve_http_sink(dest: Path, port: int = 8765):
+    """Accept (chunked) PUT /<filename> and store the body in `dest`.
+
+    Chunks are appended to a partial file named after the Upload-Id, and
+    HEAD reports how much of it exists so clients can resume.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    dest = Path(dest)
+    dest.mkdir(parents=True, exist_ok=True)
+
+    class Handler(BaseHTTPRequestHandler):
+        def _paths(self):
+            name = Path(urllib.parse.unquote(self.path)).name
+            upload_id = Path(self.headers.get("Upload-Id", "")).name[:16]
+            return dest / name, dest / f".{name}.{upload_id}.part"
+
+        def _reply(self, status: int, offset: int):
+            self.send_response(status)
+            self.send_header("Upload-Offset", str(offset))
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def do_HEAD(self):
+            _, part = self._paths()
+            self._reply(200, part.stat().st_size if part.exists() else 0)
+
+        def do_PUT(self):
+            final, part = self._paths()
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            content_range = self.headers.get("Content-Range")
+            if content_range is None:
+                final.write_bytes(body)
+                self._reply(201, len(body))
+                return
+
+            span, total = content_range.split()[1].split("/")
+            start = int(span.split("-")[0])
+            have = part.stat().st_size if part.exists() else 0
+            if start != have:
+                self._reply(409, have)   # client resumes from our offset
+                return
+            with open(part, "ab") as f:
+                f.write(body)
+            have += len(body)
+            if have >= int(total):
+                os.replace(part, final)
+                self._reply(201, have)
+            else:
+                self._reply(202, have)
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    print(f"HTTP sink on http://127.0.0.1:{port} -> {dest}")
+    server.serve_forever()